@@ -0,0 +1,104 @@
+"""
+Shared dependencies for API v1 endpoints
+Components live on app.state (created in the lifespan) and are built on demand otherwise
+"""
+import asyncio
+
+from fastapi import FastAPI, Request
+
+from ...llm.groq_client import get_groq_client
+from ...rag.embeddings_local import LocalEmbeddingGenerator, get_embedding_generator
+from ...rag.embedding_batcher import EmbeddingBatcher
+from ...rag.vector_store import SupabaseVectorStore
+from ...rag.rag_pipeline import RAGPipeline, get_rag_pipeline
+
+
+def init_components(app: FastAPI, warmup: bool = True):
+    """
+    Create the shared components on app.state
+    
+    Args:
+        app: FastAPI application
+        warmup: Run one dummy encode so the first request doesn't pay for it
+    """
+    embedder = _embedder(app)
+    _embed_batcher(app)
+    _vector_store(app)
+    _rag(app)
+    
+    if warmup:
+        embedder.encode(["warmup"])
+
+
+async def ainit_components(app: FastAPI, warmup: bool = True):
+    """
+    Async variant of init_components() for the lifespan
+    
+    The independent pieces load concurrently in worker threads - model
+    weights (CPU/disk) overlap with the Supabase and Groq client setup -
+    so startup takes about as long as the slowest one instead of the sum.
+    
+    Args:
+        app: FastAPI application
+        warmup: Run one dummy encode so the first request doesn't pay for it
+    """
+    embedder, _, _ = await asyncio.gather(
+        asyncio.to_thread(_embedder, app),
+        asyncio.to_thread(_vector_store, app),
+        asyncio.to_thread(get_groq_client)
+    )
+    
+    # Cheap once the above exist
+    _embed_batcher(app)
+    _rag(app)
+    
+    if warmup:
+        await asyncio.to_thread(embedder.encode, ["warmup"])
+
+
+def _embedder(app: FastAPI) -> LocalEmbeddingGenerator:
+    if getattr(app.state, "embedder", None) is None:
+        app.state.embedder = get_embedding_generator()
+    return app.state.embedder
+
+
+def _embed_batcher(app: FastAPI) -> EmbeddingBatcher:
+    if getattr(app.state, "embed_batcher", None) is None:
+        app.state.embed_batcher = EmbeddingBatcher(_embedder(app))
+    return app.state.embed_batcher
+
+
+def _vector_store(app: FastAPI) -> SupabaseVectorStore:
+    if getattr(app.state, "vector_store", None) is None:
+        app.state.vector_store = SupabaseVectorStore()
+    return app.state.vector_store
+
+
+def _rag(app: FastAPI) -> RAGPipeline:
+    if getattr(app.state, "rag", None) is None:
+        app.state.rag = get_rag_pipeline(
+            embedder=_embedder(app),
+            vector_store=_vector_store(app),
+            embed_batcher=_embed_batcher(app)
+        )
+    return app.state.rag
+
+
+def get_embedder(request: Request) -> LocalEmbeddingGenerator:
+    """Shared embedding model"""
+    return _embedder(request.app)
+
+
+def get_embed_batcher(request: Request) -> EmbeddingBatcher:
+    """Shared micro-batcher in front of the embedding model"""
+    return _embed_batcher(request.app)
+
+
+def get_vector_store(request: Request) -> SupabaseVectorStore:
+    """Shared Supabase vector store"""
+    return _vector_store(request.app)
+
+
+def get_rag(request: Request) -> RAGPipeline:
+    """Shared RAG pipeline (reuses the embedder, batcher and vector store above)"""
+    return _rag(request.app)
@@ -0,0 +1,79 @@
+"""
+Batch endpoint - Run several data/calculator calls in one round-trip
+Used by the dashboard to load tax slabs, allocations and comparisons together
+"""
+import asyncio
+from typing import Any, Dict, List, Literal
+
+import orjson
+from fastapi import APIRouter, Body, HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, Field, ValidationError
+
+from . import calculator, data
+from ..responses import NumpyORJSONResponse
+from ....core.logger import setup_logger
+
+logger = setup_logger(__name__)
+router = APIRouter()
+
+
+class BatchRequest(BaseModel):
+    """Single sub-request inside a batch"""
+    endpoint: Literal["tax-slabs", "allocations", "calculate-tax", "compare-regimes"]
+    params: Dict[str, Any] = Field(default_factory=dict, description="Query params / body fields")
+
+
+class BatchResponse(BaseModel):
+    """Result of a single sub-request"""
+    endpoint: str
+    status: int
+    body: Any
+
+
+def _calculate_tax(params: Dict[str, Any]):
+    request = calculator.TaxCalculationRequest(**params)
+    return calculator.calculate_income_tax(request, detail=params.get("detail", True))
+
+
+# endpoint name -> coroutine factory taking the sub-request params
+_HANDLERS = {
+    "tax-slabs": lambda params: data.get_tax_slabs(**params),
+    "allocations": lambda params: data.get_budget_allocations(),
+    "calculate-tax": _calculate_tax,
+    "compare-regimes": lambda params: calculator.compare_tax_regimes(**params),
+}
+
+
+async def _dispatch(request: BatchRequest) -> Dict[str, Any]:
+    """Run one sub-request, turning failures into a per-item error"""
+    try:
+        result = await _HANDLERS[request.endpoint](request.params)
+    except (ValidationError, TypeError, ValueError) as e:
+        return {"endpoint": request.endpoint, "status": 422, "body": {"detail": str(e)}}
+    except HTTPException as e:
+        return {"endpoint": request.endpoint, "status": e.status_code, "body": {"detail": e.detail}}
+    except Exception as e:
+        logger.error("Batch sub-request failed: %s", e, exc_info=True)
+        return {"endpoint": request.endpoint, "status": 500, "body": {"detail": "Internal error"}}
+    
+    if isinstance(result, Response):
+        # Already-serialized JSON is embedded as-is instead of being re-parsed
+        body = orjson.Fragment(result.body)
+        status = result.status_code
+    else:
+        body = jsonable_encoder(result)
+        status = 200
+    
+    return {"endpoint": request.endpoint, "status": status, "body": body}
+
+
+@router.post("/batch", responses={200: {"model": List[BatchResponse]}})
+async def batch(requests: List[BatchRequest] = Body(..., max_length=20)):
+    """
+    Execute multiple data/calculator requests concurrently
+    
+    Returns one result per sub-request, in the same order
+    """
+    responses = await asyncio.gather(*[_dispatch(r) for r in requests])
+    return NumpyORJSONResponse(responses)
@@ -1,9 +1,14 @@
 """
 Calculator endpoints for income tax and impact simulations
 """
-from fastapi import APIRouter
+from bisect import bisect_right
+
+import numpy as np
+from fastapi import APIRouter, Query
 from pydantic import BaseModel, Field
 
+from ..responses import NumpyORJSONResponse
+
 router = APIRouter()
 
 
@@ -14,6 +19,12 @@ class TaxCalculationRequest(BaseModel):
     deductions: float = Field(0, ge=0, description="Total deductions (80C, 80D, etc.)")
 
 
+class RegimeComparisonBatchRequest(BaseModel):
+    """Batch regime comparison request (e.g. for what-if charts)"""
+    incomes: list[float] = Field(..., min_length=1, max_length=1000, description="Annual incomes in INR")
+    deductions: float = Field(0, ge=0, description="Deductions applied under the old regime")
+
+
 class TaxBreakdown(BaseModel):
     """Tax breakdown by slab"""
     slab_min: int
@@ -36,63 +47,115 @@ class TaxCalculationResponse(BaseModel):
     take_home: float
 
 
-@router.post("/calculate-tax", response_model=TaxCalculationResponse)
-async def calculate_income_tax(request: TaxCalculationRequest):
+class RegimeComparisonResponse(BaseModel):
+    """Old vs new regime comparison response"""
+    income: float
+    deductions: float
+    new_regime: TaxCalculationResponse
+    old_regime: TaxCalculationResponse
+    savings: float
+    better_regime: str
+    recommendation: str
+
+
+# Slab tables: upper bound of each finite slab and the marginal rate per slab
+# (the last rate applies to income above the highest bound)
+_NEW_BOUNDS = (300_000, 600_000, 900_000, 1_200_000, 1_500_000)
+_NEW_RATES = (0.0, 0.05, 0.10, 0.15, 0.20, 0.30)
+
+_OLD_BOUNDS = (250_000, 500_000, 1_000_000)
+_OLD_RATES = (0.0, 0.05, 0.20, 0.30)
+
+
+def _cumulative_tax(bounds: tuple, rates: tuple) -> tuple:
+    """Tax payable on income up to the lower bound of each slab"""
+    cumulative = [0.0]
+    lower = 0
+    for upper, rate in zip(bounds, rates):
+        cumulative.append(cumulative[-1] + (upper - lower) * rate)
+        lower = upper
+    return tuple(cumulative)
+
+
+_NEW_CUM_TAX = _cumulative_tax(_NEW_BOUNDS, _NEW_RATES)
+_OLD_CUM_TAX = _cumulative_tax(_OLD_BOUNDS, _OLD_RATES)
+
+
+def _slab_arrays(bounds: tuple, rates: tuple) -> tuple:
+    """Slab lower bounds, widths and rates as arrays for the batched kernel"""
+    lowers = np.array((0,) + bounds, dtype=np.float64)
+    widths = np.diff(lowers, append=np.inf)
+    return lowers, widths, np.array(rates, dtype=np.float64)
+
+
+_NEW_SLAB_ARRAYS = _slab_arrays(_NEW_BOUNDS, _NEW_RATES)
+_OLD_SLAB_ARRAYS = _slab_arrays(_OLD_BOUNDS, _OLD_RATES)
+
+
+def _compute_tax(
+    incomes: np.ndarray,
+    deductions: np.ndarray | float,
+    regime: str
+) -> np.ndarray:
     """
-    Calculate income tax based on new/old regime
+    Vectorized base tax (before cess) for an array of incomes
     
-    Returns detailed breakdown and effective tax rate
+    Broadcasts incomes against the slab arrays, so a whole batch is
+    computed in a handful of numpy operations.
+    """
+    if regime == "new":
+        lowers, widths, rates = _NEW_SLAB_ARRAYS
+        taxable = incomes
+    else:
+        lowers, widths, rates = _OLD_SLAB_ARRAYS
+        taxable = np.maximum(incomes - deductions, 0)
+    
+    per_slab = np.clip(taxable[..., None] - lowers, 0, widths) * rates
+    return per_slab.sum(axis=-1)
+
+
+def _calculate_tax(
+    request: TaxCalculationRequest,
+    detail: bool = True
+) -> TaxCalculationResponse:
+    """
+    Compute tax liability for a single request
+    
+    Shared by the calculate-tax and compare-regimes endpoints.
+    The per-slab breakdown is only built when detail is True.
     """
     income = request.income
     deductions = request.deductions if request.regime == "old" else 0
     taxable_income = max(0, income - deductions)
     
-    # Define slabs
     if request.regime == "new":
-        slabs = [
-            (0, 300000, 0),
-            (300000, 600000, 0.05),
-            (600000, 900000, 0.10),
-            (900000, 1200000, 0.15),
-            (1200000, 1500000, 0.20),
-            (1500000, None, 0.30),
-        ]
+        bounds, rates, cum_tax = _NEW_BOUNDS, _NEW_RATES, _NEW_CUM_TAX
     else:
-        slabs = [
-            (0, 250000, 0),
-            (250000, 500000, 0.05),
-            (500000, 1000000, 0.20),
-            (1000000, None, 0.30),
-        ]
+        bounds, rates, cum_tax = _OLD_BOUNDS, _OLD_RATES, _OLD_CUM_TAX
     
-    # Calculate tax
-    remaining = taxable_income
-    total_tax = 0
-    breakdown = []
+    # Locate the top slab, then add the marginal tax within it
+    top = bisect_right(bounds, taxable_income)
+    top_min = bounds[top - 1] if top else 0
+    total_tax = cum_tax[top] + (taxable_income - top_min) * rates[top]
     
-    for slab_min, slab_max, rate in slabs:
-        if remaining <= 0:
-            break
-        
-        # Amount in this slab
-        if slab_max is None:
-            taxable_in_slab = remaining
-        else:
-            taxable_in_slab = min(remaining, slab_max - slab_min)
-        
-        tax_in_slab = taxable_in_slab * rate
-        total_tax += tax_in_slab
-        
-        if taxable_in_slab > 0:
-            breakdown.append(TaxBreakdown(
-                slab_min=slab_min,
-                slab_max=slab_max,
-                rate=rate,
-                taxable_amount=taxable_in_slab,
-                tax_amount=tax_in_slab
-            ))
-        
-        remaining -= taxable_in_slab
+    breakdown = []
+    if detail:
+        slab_min = 0
+        for i in range(top + 1):
+            slab_max = bounds[i] if i < len(bounds) else None
+            taxable_in_slab = (slab_max if i < top else taxable_income) - slab_min
+            
+            if taxable_in_slab > 0:
+                # Values come from our own slab tables, so skip validation
+                breakdown.append(TaxBreakdown.model_construct(
+                    slab_min=slab_min,
+                    slab_max=slab_max,
+                    rate=rates[i],
+                    taxable_amount=float(taxable_in_slab),
+                    tax_amount=float(taxable_in_slab * rates[i])
+                ))
+            
+            slab_min = slab_max
     
     # Add 4% cess
     cess = total_tax * 0.04
@@ -113,27 +176,68 @@ async def calculate_income_tax(request: TaxCalculationRequest):
     )
 
 
-@router.post("/compare-regimes")
+@router.post("/calculate-tax", responses={200: {"model": TaxCalculationResponse}})
+async def calculate_income_tax(
+    request: TaxCalculationRequest,
+    detail: bool = Query(True, description="Include the per-slab breakdown")
+):
+    """
+    Calculate income tax based on new/old regime
+    
+    Returns detailed breakdown and effective tax rate
+    """
+    response = _calculate_tax(request, detail=detail)
+    return NumpyORJSONResponse(response.model_dump())
+
+
+@router.post("/compare-regimes", responses={200: {"model": RegimeComparisonResponse}})
 async def compare_tax_regimes(income: float, deductions: float = 0):
     """
     Compare tax liability between old and new regime
     """
-    new_regime = await calculate_income_tax(
+    new_regime = _calculate_tax(
         TaxCalculationRequest(income=income, regime="new", deductions=0)
     )
-    old_regime = await calculate_income_tax(
+    old_regime = _calculate_tax(
         TaxCalculationRequest(income=income, regime="old", deductions=deductions)
     )
     
     savings = old_regime.total_liability - new_regime.total_liability
     better_regime = "new" if savings > 0 else "old"
     
-    return {
+    return NumpyORJSONResponse({
         "income": income,
         "deductions": deductions,
-        "new_regime": new_regime,
-        "old_regime": old_regime,
+        "new_regime": new_regime.model_dump(),
+        "old_regime": old_regime.model_dump(),
         "savings": abs(savings),
         "better_regime": better_regime,
         "recommendation": f"{'New' if better_regime == 'new' else 'Old'} regime saves ₹{abs(savings):,.0f}"
-    }
+    })
+
+
+@router.post("/compare-regimes/batch")
+async def compare_tax_regimes_batch(request: RegimeComparisonBatchRequest):
+    """
+    Compare both regimes for many incomes at once
+    
+    Returns parallel arrays (one entry per income) for charting
+    """
+    incomes = np.asarray(request.incomes, dtype=np.float64)
+    
+    new_tax = _compute_tax(incomes, 0, "new")
+    old_tax = _compute_tax(incomes, request.deductions, "old")
+    
+    # Add 4% cess
+    new_liability = new_tax + new_tax * 0.04
+    old_liability = old_tax + old_tax * 0.04
+    savings = old_liability - new_liability
+    
+    return NumpyORJSONResponse({
+        "incomes": incomes,
+        "deductions": request.deductions,
+        "new_regime_liability": new_liability,
+        "old_regime_liability": old_liability,
+        "savings": np.abs(savings),
+        "better_regime": np.where(savings > 0, "new", "old").tolist()
+    })
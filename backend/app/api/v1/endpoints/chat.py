@@ -1,43 +1,96 @@
 """
 Chat endpoint - Main RAG interface
 """
-from fastapi import APIRouter, HTTPException
+import logging
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import StreamingResponse
 from uuid import uuid4
 
-from ..models import ChatRequest, ChatResponse, Source
-from ....rag.rag_pipeline import get_rag_pipeline
+from ..deps import get_rag
+from ..models import ChatRequest, ChatResponse
+from ..wire import ChatWire, SourceWire, encoder
+from ....rag.rag_pipeline import RAGPipeline
 from ....core.logger import setup_logger
 
 logger = setup_logger(__name__)
 router = APIRouter()
 
 
-@router.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
+@router.post("/chat", responses={200: {"model": ChatResponse}})
+async def chat(request: ChatRequest, rag: RAGPipeline = Depends(get_rag)):
     """
     Chat endpoint with RAG
     
     Process user question with retrieval-augmented generation
     """
     try:
-        logger.info(f"Chat request: {request.message[:100]}")
-        
-        # Get RAG pipeline
-        rag = get_rag_pipeline()
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Chat request: %s", request.message[:100])
         
-        # Process query
-        result = rag.query(
+        # Process query (blocking work is offloaded to worker threads)
+        result = await rag.aquery(
             question=request.message,
             user_metadata=request.user_metadata
         )
         
-        # Format response
-        return ChatResponse(
+        # Encode with the msgspec wire struct (sources are built by
+        # format_response_with_sources, so no validation pass is needed)
+        response = ChatWire(
             answer=result['answer'],
-            sources=[Source(**source) for source in result['sources']],
+            sources=[SourceWire(**source) for source in result['sources']],
             conversation_id=request.conversation_id or str(uuid4())
         )
+        return Response(content=encoder.encode(response), media_type="application/json")
     
     except Exception as e:
-        logger.error(f"Chat endpoint error: {str(e)}", exc_info=True)
+        logger.error("Chat endpoint error: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to process chat request")
+
+
+async def _event_stream(
+    stream: AsyncIterator[Tuple[str, Optional[List[Dict]]]],
+    conversation_id: str
+) -> AsyncIterator[bytes]:
+    """
+    Encode RAG stream output as server-sent events
+    
+    Each answer delta is sent as a default "message" event; sources follow
+    in a final "sources" event once generation has finished.
+    """
+    try:
+        async for delta, sources in stream:
+            if delta:
+                yield b"data: " + orjson.dumps({"delta": delta}) + b"\n\n"
+            if sources is not None:
+                payload = {"sources": sources, "conversation_id": conversation_id}
+                yield b"event: sources\ndata: " + orjson.dumps(payload) + b"\n\n"
+    
+    except Exception as e:
+        # Headers are already sent, so report the failure in-band
+        logger.error("Chat stream error: %s", e, exc_info=True)
+        yield b"event: error\ndata: " + orjson.dumps({"detail": "Failed to process chat request"}) + b"\n\n"
+
+
+@router.post("/chat/stream")
+async def chat_stream(request: ChatRequest, rag: RAGPipeline = Depends(get_rag)):
+    """
+    Streaming chat endpoint with RAG
+    
+    Returns a text/event-stream of answer tokens followed by the sources
+    """
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Chat stream request: %s", request.message[:100])
+    
+    stream = rag.stream_query(
+        question=request.message,
+        user_metadata=request.user_metadata
+    )
+    
+    return StreamingResponse(
+        _event_stream(stream, request.conversation_id or str(uuid4())),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
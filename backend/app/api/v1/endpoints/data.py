@@ -2,9 +2,12 @@
 Data endpoints for visualizations
 Returns structured data for tax slabs, allocations, etc.
 """
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
 from typing import List
 from pydantic import BaseModel
+import orjson
+
+from ..responses import NumpyORJSONResponse
 
 router = APIRouter()
 
@@ -38,7 +41,41 @@ class AllocationsResponse(BaseModel):
     allocations: List[AllocationItem]
 
 
-@router.get("/tax-slabs", response_model=TaxSlabsResponse)
+# Income tax slabs for FY 2026-27
+_NEW_REGIME_SLABS = [
+    TaxSlab(min_income=0, max_income=300000, rate=0, description="No tax"),
+    TaxSlab(min_income=300000, max_income=600000, rate=5, description="5%"),
+    TaxSlab(min_income=600000, max_income=900000, rate=10, description="10%"),
+    TaxSlab(min_income=900000, max_income=1200000, rate=15, description="15%"),
+    TaxSlab(min_income=1200000, max_income=1500000, rate=20, description="20%"),
+    TaxSlab(min_income=1500000, max_income=None, rate=30, description="30%"),
+]
+
+_OLD_REGIME_SLABS = [
+    TaxSlab(min_income=0, max_income=250000, rate=0, description="No tax"),
+    TaxSlab(min_income=250000, max_income=500000, rate=5, description="5%"),
+    TaxSlab(min_income=500000, max_income=1000000, rate=20, description="20%"),
+    TaxSlab(min_income=1000000, max_income=None, rate=30, description="30%"),
+]
+
+
+def _tax_slabs_response(regime: str) -> TaxSlabsResponse:
+    """Build the tax slabs response for a regime (anything but 'new' is old)"""
+    return TaxSlabsResponse(
+        year="2026-27",
+        regime=regime,
+        slabs=_NEW_REGIME_SLABS if regime == "new" else _OLD_REGIME_SLABS
+    )
+
+
+# Static payloads, serialized once at import
+_TAX_SLABS_BYTES = {
+    regime: orjson.dumps(_tax_slabs_response(regime).model_dump())
+    for regime in ("new", "old")
+}
+
+
+@router.get("/tax-slabs", responses={200: {"model": TaxSlabsResponse}})
 async def get_tax_slabs(regime: str = "new"):
     """
     Get income tax slabs for FY 2026-27
@@ -46,53 +83,40 @@ async def get_tax_slabs(regime: str = "new"):
     Query params:
         regime: 'new' or 'old'
     """
-    if regime == "new":
-        slabs = [
-            TaxSlab(min_income=0, max_income=300000, rate=0, description="No tax"),
-            TaxSlab(min_income=300000, max_income=600000, rate=5, description="5%"),
-            TaxSlab(min_income=600000, max_income=900000, rate=10, description="10%"),
-            TaxSlab(min_income=900000, max_income=1200000, rate=15, description="15%"),
-            TaxSlab(min_income=1200000, max_income=1500000, rate=20, description="20%"),
-            TaxSlab(min_income=1500000, max_income=None, rate=30, description="30%"),
-        ]
-    else:  # old regime
-        slabs = [
-            TaxSlab(min_income=0, max_income=250000, rate=0, description="No tax"),
-            TaxSlab(min_income=250000, max_income=500000, rate=5, description="5%"),
-            TaxSlab(min_income=500000, max_income=1000000, rate=20, description="20%"),
-            TaxSlab(min_income=1000000, max_income=None, rate=30, description="30%"),
-        ]
+    content = _TAX_SLABS_BYTES.get(regime)
+    if content is not None:
+        return Response(content=content, media_type="application/json")
     
-    return TaxSlabsResponse(
+    return NumpyORJSONResponse(_tax_slabs_response(regime).model_dump())
+
+
+# Major budget allocations by sector for 2026-27
+# Approximate values from budget documents (in crores)
+_ALLOCATIONS = [
+    AllocationItem(sector="Defence", amount=650000, percentage=12.5),
+    AllocationItem(sector="Education", amount=450000, percentage=8.5),
+    AllocationItem(sector="Healthcare", amount=380000, percentage=7.2),
+    AllocationItem(sector="Infrastructure", amount=1100000, percentage=21.0),
+    AllocationItem(sector="Agriculture", amount=320000, percentage=6.1),
+    AllocationItem(sector="Social Welfare", amount=580000, percentage=11.2),
+    AllocationItem(sector="Energy", amount=280000, percentage=5.4),
+    AllocationItem(sector="Other", amount=1440000, percentage=28.1),
+]
+
+_ALLOCATIONS_BYTES = orjson.dumps(
+    AllocationsResponse(
         year="2026-27",
-        regime=regime,
-        slabs=slabs
-    )
+        total=sum(item.amount for item in _ALLOCATIONS),
+        allocations=_ALLOCATIONS
+    ).model_dump()
+)
 
 
-@router.get("/allocations", response_model=AllocationsResponse)
+@router.get("/allocations", responses={200: {"model": AllocationsResponse}})
 async def get_budget_allocations():
     """
     Get major budget allocations by sector for 2026-27
     
     Based on Budget at a Glance
     """
-    # Approximate values from budget documents (in crores)
-    allocations = [
-        AllocationItem(sector="Defence", amount=650000, percentage=12.5),
-        AllocationItem(sector="Education", amount=450000, percentage=8.5),
-        AllocationItem(sector="Healthcare", amount=380000, percentage=7.2),
-        AllocationItem(sector="Infrastructure", amount=1100000, percentage=21.0),
-        AllocationItem(sector="Agriculture", amount=320000, percentage=6.1),
-        AllocationItem(sector="Social Welfare", amount=580000, percentage=11.2),
-        AllocationItem(sector="Energy", amount=280000, percentage=5.4),
-        AllocationItem(sector="Other", amount=1440000, percentage=28.1),
-    ]
-    
-    total = sum(item.amount for item in allocations)
-    
-    return AllocationsResponse(
-        year="2026-27",
-        total=total,
-        allocations=allocations
-    )
+    return Response(content=_ALLOCATIONS_BYTES, media_type="application/json")
@@ -1,54 +1,82 @@
 """
 Health check endpoint
 """
-from fastapi import APIRouter
+import asyncio
+from typing import Tuple
 
+from fastapi import APIRouter, Request
+
+from ..deps import get_vector_store
 from ..models import HealthResponse
-from ....rag.vector_store import SupabaseVectorStore
+from ..responses import NumpyORJSONResponse
 from ....llm.groq_client import get_groq_client
 from ....core.logger import setup_logger
 
 logger = setup_logger(__name__)
 router = APIRouter()
 
+# Per-check time budget (seconds); a slow component is reported, not waited on
+CHECK_TIMEOUT = 0.5
+
+
+async def _check_db(request: Request) -> Tuple[str, str]:
+    """Check database"""
+    store = await asyncio.to_thread(get_vector_store, request)
+    count = await asyncio.to_thread(store.get_chunk_count)
+    return "database", f"ok ({count} chunks)"
 
-@router.get("/health", response_model=HealthResponse)
-async def health_check():
+
+async def _check_embedder(request: Request) -> Tuple[str, str]:
     """
-    Health check endpoint
+    Check embedding model
     
-    Returns status of all system components
+    Never loads it: with PRELOAD_MODELS=False that takes seconds and
+    happens on the first request that needs the model
     """
-    components = {}
-    
-    # Check database
-    try:
-        store = SupabaseVectorStore()
-        count = store.get_chunk_count()
-        components["database"] = f"ok ({count} chunks)"
-    except Exception as e:
-        components["database"] = f"error: {str(e)[:50]}"
+    if getattr(request.app.state, "embedder", None) is None:
+        return "embedding_model", "not loaded yet (lazy loading)"
+    return "embedding_model", "loaded"
+
+
+async def _check_groq(request: Request) -> Tuple[str, str]:
+    """Check Groq API"""
+    await asyncio.to_thread(get_groq_client)
+    return "groq_api", "ok"
+
+
+_CHECKS = (_check_db, _check_embedder, _check_groq)
+_CHECK_NAMES = ("database", "embedding_model", "groq_api")
+
+
+@router.get("/health", responses={200: {"model": HealthResponse}})
+async def health_check(request: Request):
+    """
+    Health check endpoint
     
-    # Check embedding model
-    try:
-        from ....rag.embeddings_local import LocalEmbeddingGenerator
-        embedder = LocalEmbeddingGenerator()
-        components["embedding_model"] = "loaded"
-    except Exception as e:
-        components["embedding_model"] = f"error: {str(e)[:50]}"
+    Returns status of all system components (reusing the shared
+    components on app.state rather than building new ones).
+    Checks run concurrently, each bounded by CHECK_TIMEOUT.
+    """
+    results = await asyncio.gather(
+        *(asyncio.wait_for(check(request), CHECK_TIMEOUT) for check in _CHECKS),
+        return_exceptions=True
+    )
     
-    # Check Groq API
-    try:
-        llm = get_groq_client()
-        components["groq_api"] = "ok"
-    except Exception as e:
-        components["groq_api"] = f"error: {str(e)[:50]}"
+    components = {}
+    for name, result in zip(_CHECK_NAMES, results):
+        if isinstance(result, asyncio.TimeoutError):
+            components[name] = f"error: timed out after {CHECK_TIMEOUT}s"
+        elif isinstance(result, Exception):
+            components[name] = f"error: {str(result)[:50]}"
+        else:
+            components[name] = result[1]
     
     # Overall status
-    all_ok = all("ok" in status or "loaded" in status for status in components.values())
+    all_ok = not any(status.startswith("error") for status in components.values())
     
-    return HealthResponse(
+    response = HealthResponse(
         status="healthy" if all_ok else "degraded",
         components=components,
         version="1.0.0"
     )
+    return NumpyORJSONResponse(response.model_dump())
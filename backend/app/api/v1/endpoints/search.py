@@ -1,26 +1,28 @@
 """
 Search endpoint - Direct vector search
 """
-from fastapi import APIRouter, HTTPException, Query
+import logging
 
-from ..models import SearchResponse, SearchResult
-from ....rag.embeddings_local import LocalEmbeddingGenerator
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+
+from ..deps import get_embed_batcher, get_vector_store
+from ..models import SearchResponse
+from ..wire import SearchResultWire, SearchWire, encoder
+from ....rag.embedding_batcher import EmbeddingBatcher
 from ....rag.vector_store import SupabaseVectorStore
 from ....core.logger import setup_logger
 
 logger = setup_logger(__name__)
 router = APIRouter()
 
-# Initialize components
-embedder = LocalEmbeddingGenerator()
-vector_store = SupabaseVectorStore()
-
 
-@router.get("/search", response_model=SearchResponse)
+@router.get("/search", responses={200: {"model": SearchResponse}})
 async def search(
     q: str = Query(..., min_length=1, max_length=500, description="Search query"),
     limit: int = Query(5, ge=1, le=20, description="Number of results"),
-    threshold: float = Query(0.3, ge=0.0, le=1.0, description="Similarity threshold")
+    threshold: float = Query(0.3, ge=0.0, le=1.0, description="Similarity threshold"),
+    embed_batcher: EmbeddingBatcher = Depends(get_embed_batcher),
+    vector_store: SupabaseVectorStore = Depends(get_vector_store)
 ):
     """
     Direct vector search without LLM generation
@@ -28,22 +30,24 @@ async def search(
     Returns relevant budget document chunks
     """
     try:
-        logger.info(f"Search request: {q[:100]}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Search request: %s", q[:100])
         
-        # Generate embedding
-        query_embedding = embedder.generate_embedding(q)
+        # Generate embedding (micro-batched with concurrent requests)
+        query_embedding = await embed_batcher.submit(q)
         
         # Search
-        results = vector_store.similarity_search(
+        results = await vector_store.asimilarity_search(
             query_embedding=query_embedding,
             k=limit,
             threshold=threshold
         )
         
-        # Format response
-        return SearchResponse(
+        # Encode with the msgspec wire struct. Rows come from our own match
+        # function with fixed column types, so no validation pass is needed.
+        response = SearchWire(
             results=[
-                SearchResult(
+                SearchResultWire(
                     text=r['text'],
                     document=r['document_name'],
                     page=r['page_number'],
@@ -54,7 +58,8 @@ async def search(
             ],
             total=len(results)
         )
+        return Response(content=encoder.encode(response), media_type="application/json")
     
     except Exception as e:
-        logger.error(f"Search endpoint error: {str(e)}", exc_info=True)
+        logger.error("Search endpoint error: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to process search request")
@@ -0,0 +1,21 @@
+"""
+Response classes for API v1
+orjson-backed JSON rendering (Rust encoder, native numpy support)
+"""
+from typing import Any
+
+import orjson
+from fastapi.responses import ORJSONResponse
+
+
+class NumpyORJSONResponse(ORJSONResponse):
+    """
+    ORJSONResponse that also serializes numpy arrays and scalars natively
+    (e.g. embedding vectors and similarity scores)
+    """
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
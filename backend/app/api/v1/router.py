@@ -4,9 +4,10 @@ Aggregates all v1 endpoints
 """
 from fastapi import APIRouter
 
-from .endpoints import chat, search, health, data, calculator
+from .endpoints import chat, search, health, data, calculator, batch
+from .responses import NumpyORJSONResponse
 
-router = APIRouter(prefix="/v1")
+router = APIRouter(prefix="/v1", default_response_class=NumpyORJSONResponse)
 
 # Include all endpoint routers
 router.include_router(chat.router, tags=["chat"])
@@ -14,3 +15,4 @@ router.include_router(search.router, tags=["search"])
 router.include_router(health.router, tags=["health"])
 router.include_router(data.router, prefix="/data", tags=["data"])
 router.include_router(calculator.router, prefix="/calculate", tags=["calculator"])
+router.include_router(batch.router, tags=["batch"])
@@ -0,0 +1,41 @@
+"""
+Wire formats for hot API responses
+msgspec Structs mirroring the Pydantic models in models.py, encoded without validation
+"""
+from typing import Any, Dict, List, Optional
+
+import msgspec
+
+
+class SourceWire(msgspec.Struct):
+    """Mirror of models.Source"""
+    document: str
+    page: int
+    similarity: float
+    excerpt: str
+
+
+class ChatWire(msgspec.Struct):
+    """Mirror of models.ChatResponse"""
+    answer: str
+    sources: List[SourceWire]
+    conversation_id: Optional[str] = None
+
+
+class SearchResultWire(msgspec.Struct):
+    """Mirror of models.SearchResult"""
+    text: str
+    document: str
+    page: int
+    similarity: float
+    metadata: Optional[Dict[str, Any]] = None
+
+
+class SearchWire(msgspec.Struct):
+    """Mirror of models.SearchResponse"""
+    results: List[SearchResultWire]
+    total: int
+
+
+# Encoders are reusable and keep an internal output buffer
+encoder = msgspec.json.Encoder()
@@ -32,15 +32,28 @@ class Settings(BaseSettings):
     # Embeddings (100% Free - Local Model)
     EMBEDDING_MODEL: str = "sentence-transformers/all-MiniLM-L6-v2"
     EMBEDDING_PROVIDER: str = "local"  # local (free) or openai (paid)
+    EMBEDDING_BACKEND: str = "torch"  # torch or onnx (int8, run scripts/export_onnx_int8.py first)
+    EMBEDDING_ONNX_DIR: Path = OUTPUT_DIR / "onnx-minilm-int8"
+    EMBED_THREADS: int = 0  # Embedding intra-op threads, ONNX Runtime or torch (0 = runtime default)
     VECTOR_DIMENSION: int = 384  # 384 for local, 1536 for OpenAI
+    EMBED_BATCH_MAX_SIZE: int = 32  # Max queries per micro-batch
+    EMBED_BATCH_MAX_WAIT_MS: int = 20  # Max time to wait for a batch to fill
+    EMBED_CACHE_SIZE: int = 4096  # Max cached query vectors (0 disables)
+    EMBEDDING_CACHE_ENABLED: bool = True  # Persistent vector cache for embed_chunks (re-runs skip unchanged text)
+    EMBEDDING_CACHE_PATH: Path = OUTPUT_DIR / "embedding_cache.sqlite3"
+    EMBEDDING_STORE_DTYPE: str = "float16"  # Saved embedding sidecars: float16 (half size) or float32
     
     # Supabase (Production Vector Store)
     SUPABASE_URL: str = ""
     SUPABASE_KEY: str = ""
     SUPABASE_TABLE: str = "budget_chunks"
+    SUPABASE_DB_URL: str = ""  # Direct Postgres URL; set to bulk-upload with COPY instead of PostgREST
+    UPLOAD_CONCURRENCY: int = 8  # PostgREST upload batches in flight (COPY uploads run one at a time)
     
     # OpenAI API (for embeddings)
     OPENAI_API_KEY: str = ""
+    EMBED_API_CONCURRENCY: int = 8  # Max embedding batches in flight
+    EMBED_API_RPM: int = 3000  # Embedding requests per minute (0 = unpaced)
     
     # LLM Configuration (Hybrid Approach)
     LLM_PROVIDER: str = "groq"  # groq, openai, or anthropic
@@ -61,6 +74,7 @@ class Settings(BaseSettings):
     # API Configuration
     HOST: str = "0.0.0.0"
     PORT: int = 8000
+    PRELOAD_MODELS: bool = True  # Load models at startup (False = on first request)
     
     # LLM API Keys
     LLM_API_KEY: str = ""  # Generic key for selected provider
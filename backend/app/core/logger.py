@@ -1,21 +1,32 @@
 """
 Structured logging configuration for Budget 2026 AI Platform
+Records are queued and written by a background listener thread
 """
+import atexit
+import copy
 import logging
+import os
+import queue
 import sys
-import json
-from datetime import datetime
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional
+import orjson
 from .config import settings
 
 
 class JSONFormatter(logging.Formatter):
     """Custom JSON formatter for structured logging"""
     
+    # orjson serializes the datetime natively (RFC 3339, "Z" suffix);
+    # anything else it can't handle in extra fields falls back to str()
+    _OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NAIVE_UTC
+    
     def format(self, record: logging.LogRecord) -> str:
         log_data: Dict[str, Any] = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -32,7 +43,7 @@ class JSONFormatter(logging.Formatter):
         if hasattr(record, "extra_fields"):
             log_data.update(record.extra_fields)
         
-        return json.dumps(log_data)
+        return orjson.dumps(log_data, default=str, option=self._OPTIONS).decode()
 
 
 class TextFormatter(logging.Formatter):
@@ -43,29 +54,43 @@ class TextFormatter(logging.Formatter):
         super().__init__(fmt=fmt, datefmt="%Y-%m-%d %H:%M:%S")
 
 
-def setup_logger(name: str) -> logging.Logger:
+class _RecordQueueHandler(QueueHandler):
     """
-    Setup and configure logger for a module
+    QueueHandler that leaves formatting to the listener's handlers
     
-    Args:
-        name: Logger name (typically __name__)
-        
-    Returns:
-        Configured logger instance
+    The stock prepare() pre-formats the message (folding the traceback into
+    it), which would bypass JSONFormatter. Only the %-args are merged here,
+    so later mutation of the arguments can't change what gets logged.
     """
-    logger = logging.getLogger(name)
-    logger.setLevel(getattr(logging, settings.LOG_LEVEL))
-    
-    # Remove existing handlers to avoid duplicates
-    logger.handlers.clear()
     
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+_LOG_FILE = settings.LOGS_DIR / f"budget_ai_{datetime.now().strftime('%Y%m%d')}.log"
+
+_log_queue = queue.SimpleQueue()
+_queue_handler = _RecordQueueHandler(_log_queue)
+_listener: Optional[QueueListener] = None
+
+
+def _build_listener(log_queue) -> QueueListener:
+    """Create the real (blocking) console/file handlers behind a listener"""
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(logging.DEBUG)
     
-    # File handler
-    log_file = settings.LOGS_DIR / f"budget_ai_{datetime.now().strftime('%Y%m%d')}.log"
-    file_handler = logging.FileHandler(log_file, encoding="utf-8")
+    # File handler (opened on first write, rotated at 10 MB)
+    file_handler = RotatingFileHandler(
+        _LOG_FILE,
+        maxBytes=10 * 1024 * 1024,
+        backupCount=5,
+        encoding="utf-8",
+        delay=True
+    )
     file_handler.setLevel(logging.DEBUG)
     
     # Choose formatter based on config
@@ -77,8 +102,77 @@ def setup_logger(name: str) -> logging.Logger:
     console_handler.setFormatter(formatter)
     file_handler.setFormatter(formatter)
     
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+    return QueueListener(
+        log_queue,
+        console_handler,
+        file_handler,
+        respect_handler_level=True
+    )
+
+
+def _start_listener():
+    """Start the listener thread once"""
+    global _listener
+    if _listener is not None:
+        return
+    
+    _listener = _build_listener(_log_queue)
+    _listener.start()
+    
+    # Flush queued records on interpreter exit
+    atexit.register(_listener.stop)
+
+
+class _DirectQueue:
+    """Queue stand-in that hands records straight to a listener's handlers"""
+    
+    def __init__(self, listener: QueueListener):
+        self.put_nowait = listener.handle
+
+
+def _after_fork_in_child():
+    """
+    Forked workers (e.g. ProcessPoolExecutor during ingestion) don't inherit
+    the listener thread and exit without running atexit, so queued records
+    would be lost. Log synchronously through fresh handlers there instead.
+    """
+    global _listener
+    if _listener is None:
+        return
+    
+    _listener = _build_listener(None)
+    _queue_handler.queue = _DirectQueue(_listener)
+
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+@lru_cache(maxsize=None)
+def setup_logger(name: str) -> logging.Logger:
+    """
+    Setup and configure logger for a module
+    
+    Loggers only enqueue records; console/file I/O happens on the
+    listener thread, off the request path. Cached per name, so repeat
+    calls return the already-configured logger.
+    
+    Args:
+        name: Logger name (typically __name__)
+        
+    Returns:
+        Configured logger instance
+    """
+    _start_listener()
+    
+    logger = logging.getLogger(name)
+    logger.setLevel(getattr(logging, settings.LOG_LEVEL))
+    
+    # Remove existing handlers to avoid duplicates
+    logger.handlers.clear()
+    logger.addHandler(_queue_handler)
+    
+    # Our handler already emits; don't repeat via root handlers (e.g. uvicorn's)
+    logger.propagate = False
     
     return logger
 
@@ -2,11 +2,12 @@
 Complete ingestion pipeline for Budget 2026 AI Platform
 Orchestrates: PDF Loading → Text Chunking → Metadata Tagging → Storage
 """
-import json
 from pathlib import Path
 from typing import List, Dict,Optional
 from datetime import datetime
 
+import orjson
+
 from .pdf_loader import PDFLoader, load_budget_documents
 from .text_splitter import SemanticTextSplitter, chunk_documents
 from .metadata_tagger import MetadataTagger, tag_document_chunks
@@ -68,11 +69,7 @@ class IngestionPipeline:
         
         # Step 2: Chunk documents
         logger.info("\n🔪 STEP 2: Chunking documents into semantic pieces...")
-        chunks_by_doc = {}
-        
-        for doc in pdf_documents:
-            chunks = self.text_splitter.chunk_document(doc)
-            chunks_by_doc[doc.filename] = chunks
+        chunks_by_doc = chunk_documents(pdf_documents, splitter=self.text_splitter)
         
         total_chunks = sum(len(chunks) for chunks in chunks_by_doc.values())
         avg_chunk_size = sum(
@@ -142,8 +139,10 @@ class IngestionPipeline:
                 for tagged_chunks in tagged_chunks_by_doc.values():
                     all_chunks.extend(tagged_chunks)
                 
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    json.dump({
+                # orjson writes UTF-8 bytes in one pass (same layout as
+                # json.dump(indent=2, ensure_ascii=False))
+                with open(output_file, 'wb') as f:
+                    f.write(orjson.dumps({
                         'metadata': {
                             'created_at': datetime.now().isoformat(),
                             'total_documents': len(pdf_documents),
@@ -154,7 +153,7 @@ class IngestionPipeline:
                             'income_ranges': sorted(list(all_income_ranges))
                         },
                         'chunks': all_chunks
-                    }, f, indent=2, ensure_ascii=False)
+                    }, option=orjson.OPT_INDENT_2))
                 
                 logger.info(f"✓ Saved to {output_file}")
             
@@ -162,18 +161,18 @@ class IngestionPipeline:
                 # Save as JSONL (one chunk per line)
                 output_file = output_dir / "budget_chunks.jsonl"
                 
-                with open(output_file, 'w', encoding='utf-8') as f:
+                with open(output_file, 'wb') as f:
                     for tagged_chunks in tagged_chunks_by_doc.values():
                         for chunk in tagged_chunks:
-                            f.write(json.dumps(chunk, ensure_ascii=False) + '\n')
+                            f.write(orjson.dumps(chunk, option=orjson.OPT_APPEND_NEWLINE))
                 
                 logger.info(f"✓ Saved to {output_file}")
             
             # Also save per-document files for inspection
             for filename, tagged_chunks in tagged_chunks_by_doc.items():
                 doc_file = output_dir / f"{Path(filename).stem}_chunks.json"
-                with open(doc_file, 'w', encoding='utf-8') as f:
-                    json.dump(tagged_chunks, f, indent=2, ensure_ascii=False)
+                with open(doc_file, 'wb') as f:
+                    f.write(orjson.dumps(tagged_chunks, option=orjson.OPT_INDENT_2))
         
         # Calculate processing time
         processing_time = (datetime.now() - start_time).total_seconds()
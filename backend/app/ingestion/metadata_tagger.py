@@ -2,16 +2,240 @@
 Metadata tagger for Budget 2026 AI Platform
 Tags chunks with: topic, user_type, sector, income_range for personalized retrieval
 """
-from typing import List, Dict, Set, Optional
-from dataclasses import dataclass, asdict
+from typing import ClassVar, List, Dict, Optional, Tuple
+from dataclasses import dataclass, replace
+from collections import Counter, OrderedDict
+from datetime import datetime
+from functools import lru_cache
+import logging
 import re
+import sys
+
+try:
+    import ahocorasick
+except ImportError:  # optional C extension - fall back to word/phrase lookups
+    ahocorasick = None
 
 from ..core.logger import setup_logger, log_extra
 
 logger = setup_logger(__name__)
 
+# Keyword extraction: common stop words and 4+ letter words
+_STOP_WORDS = frozenset({
+    'the', 'be', 'to', 'of', 'and', 'a', 'in', 'that', 'have', 'i',
+    'it', 'for', 'not', 'on', 'with', 'he', 'as', 'you', 'do', 'at',
+    'this', 'but', 'his', 'by', 'from', 'they', 'we', 'say', 'her', 'she',
+    'or', 'an', 'will', 'my', 'one', 'all', 'would', 'there', 'their',
+    'is', 'are', 'was', 'were', 'been', 'has', 'had', 'can', 'may', 'shall'
+})
+_WORD_RE = re.compile(r'\b[a-z]{4,}\b')
+
+# Maximal runs of letters (keyword matching without pyahocorasick)
+_LETTERS_RE = re.compile(r'[a-z]+')
+
+
+# Hierarchical topic structure
+_TOPIC_HIERARCHY = {
+    'tax': {'main': 'Taxation', 'sub': 'Tax Policy'},
+    'income_tax': {'main': 'Taxation', 'sub': 'Income Tax', 'section': 'Personal Tax'},
+    'gst': {'main': 'Taxation', 'sub': 'GST'},
+    'healthcare': {'main': 'Social Welfare', 'sub': 'Healthcare'},
+    'education': {'main': 'Social Welfare', 'sub': 'Education'},
+    'defense': {'main': 'National Security', 'sub': 'Defense'},
+    'agriculture': {'main': 'Economic Development', 'sub': 'Agriculture'},
+    'infrastructure': {'main': 'Economic Development', 'sub': 'Infrastructure'},
+    'employment': {'main': 'Economic Development', 'sub': 'Employment'},
+    'finance': {'main': 'Economic Policy', 'sub': 'Finance'},
+    'social_welfare': {'main': 'Social Welfare', 'sub': 'General Welfare'},
+    'energy': {'main': 'Economic Development', 'sub': 'Energy'},
+    'digital': {'main': 'Technology', 'sub': 'Digital Infrastructure'},
+    'msme': {'main': 'Economic Development', 'sub': 'MSME'}
+}
+
+# Intern category labels so every tagged chunk shares one copy
+_TOPIC_HIERARCHY = {
+    topic: {level: sys.intern(label) for level, label in levels.items()}
+    for topic, levels in _TOPIC_HIERARCHY.items()
+}
+
+# Normalized income ranges (standardized)
+_NORMALIZED_INCOME_RANGES = ('0-5L', '5-10L', '10-15L', '15L+')
+
+# Topic keywords
+_TOPIC_KEYWORDS = {
+    'tax': ('tax', 'taxation', 'income tax', 'gst', 'customs', 'excise', 'duty', 'cess', 
+           'surcharge', 'rebate', 'deduction', 'exemption', 'section 80', 'tds', 'tcs'),
+    'healthcare': ('health', 'medical', 'hospital', 'ayushman', 'medicine', 'doctor',
+                  'treatment', 'insurance', 'wellness', 'disease', 'vaccine'),
+    'education': ('education', 'school', 'university', 'student', 'scholarship', 'learning',
+                 'skill', 'training', 'research', 'academic'),
+    'defense': ('defense', 'defence', 'military', 'army', 'navy', 'air force', 'security',
+               'border', 'weapon', 'soldier'),
+    'agriculture': ('agriculture', 'farmer', 'crop', 'farming', 'irrigation', 'fertilizer',
+                   'seed', 'rural', 'kisan', 'mandi', 'minimum support price', 'msp'),
+    'infrastructure': ('infrastructure', 'road', 'highway', 'railway', 'metro', 'airport',
+                      'port', 'bridge', 'construction', 'urban development'),
+    'employment': ('employment', 'job', 'unemployment', 'wage', 'salary', 'epf', 'provident fund',
+                  'pension', 'retirement', 'employee'),
+    'finance': ('finance', 'banking', 'loan', 'credit', 'debt', 'fiscal', 'monetary',
+               'reserve bank', 'rbi', 'interest rate'),
+    'social_welfare': ('welfare', 'subsidy', 'scheme', 'benefit', 'allowance', 'pension',
+                      'poverty', 'below poverty line', 'bpl'),
+    'energy': ('energy', 'power', 'electricity', 'renewable', 'solar', 'coal', 'oil',
+              'petroleum', 'gas', 'fuel'),
+    'digital': ('digital', 'technology', 'it', 'software', 'cyber', 'internet', 'online',
+               'e-governance', 'digital india'),
+    'msme': ('msme', 'small business', 'medium enterprise', 'startup', 'entrepreneur',
+            'mudra', 'sidbi')
+}
+
+# User type keywords
+_USER_TYPE_KEYWORDS = {
+    'salaried': ('salary', 'salaried', 'employee', 'employer', 'wage', 'profession',
+                'professional', 'employment', 'tds'),
+    'business': ('business', 'trader', 'entrepreneur', 'proprietor', 'partnership',
+                'company', 'firm', 'gst', 'turnover'),
+    'senior_citizen': ('senior citizen', 'senior', 'aged', 'elderly', 'pension',
+                      '60 years', '80 years'),
+    'student': ('student', 'education', 'scholarship', 'fee', 'tuition', 'school',
+               'college', 'university'),
+    'farmer': ('farmer', 'agriculture', 'agricultural income', 'crop', 'kisan'),
+    'woman': ('woman', 'women', 'female', 'maternity', 'maternal', 'girl child',
+             'beti bachao'),
+    'disabled': ('disabled', 'disability', 'handicapped', 'differently abled', 'pwd'),
+    'nri': ('nri', 'non-resident', 'foreign', 'overseas', 'expatriate')
+}
+
+# Sector keywords
+_SECTOR_KEYWORDS = {
+    'it': ('information technology', 'software', 'it', 'tech', 'computer', 'digital'),
+    'manufacturing': ('manufacturing', 'industry', 'factory', 'production', 'make in india'),
+    'services': ('service', 'services', 'hospitality', 'tourism', 'consulting'),
+    'agriculture': ('agriculture', 'farming', 'agri', 'crop', 'livestock'),
+    'healthcare': ('healthcare', 'medical', 'pharmaceutical', 'hospital', 'clinical'),
+    'education': ('education', 'educational', 'school', 'coaching', 'training'),
+    'real_estate': ('real estate', 'property', 'housing', 'construction', 'builder'),
+    'finance': ('banking', 'finance', 'insurance', 'investment', 'nbfc'),
+    'retail': ('retail', 'shop', 'store', 'mall', 'e-commerce'),
+    'transport': ('transport', 'logistics', 'shipping', 'delivery', 'courier')
+}
+
+# Normalized income range keywords (INR in lakhs)
+_INCOME_KEYWORDS = {
+    '0-5L': ('up to', 'below 5 lakh', 'less than 5 lakh', 'upto 5 lakh',
+            'not exceeding 5 lakh', '2.5 lakh', '3 lakh', '5 lakh'),
+    '5-10L': ('5 lakh to 10 lakh', '7 lakh', '7.5 lakh', '10 lakh',
+             'between 5 and 10 lakh', 'above 5 lakh', 'exceeding 5 lakh'),
+    '10-15L': ('10 lakh to 15 lakh', '12 lakh', '12.5 lakh', '15 lakh',
+              'between 10 and 15 lakh', 'above 10 lakh'),
+    '15L+': ('above 15 lakh', 'exceeding 15 lakh', '20 lakh', '50 lakh', '1 crore',
+            'more than 15 lakh', 'super rich', 'high income')
+}
+
+_KEYWORD_DICTS = (
+    _TOPIC_KEYWORDS,
+    _USER_TYPE_KEYWORDS,
+    _SECTOR_KEYWORDS,
+    _INCOME_KEYWORDS
+)
+
+
+def _build_keyword_index(
+    keyword_dicts: Tuple[Dict[str, Tuple[str, ...]], ...]
+) -> Dict[str, Tuple[Tuple[int, str], ...]]:
+    """
+    Map each keyword to every (dict_index, category) that lists it
+    
+    The same keyword can belong to several categories and dictionaries
+    (e.g. 'pension', 'agriculture'), but only needs to be searched once.
+    """
+    owners: Dict[str, List[Tuple[int, str]]] = {}
+    for dict_index, keyword_dict in enumerate(keyword_dicts):
+        for category, keywords in keyword_dict.items():
+            for keyword in keywords:
+                owners.setdefault(keyword, []).append((dict_index, category))
+    
+    return {keyword: tuple(keyword_owners) for keyword, keyword_owners in owners.items()}
+
 
-@dataclass
+# Every (dict_index, category) gets one bit, assigned in dictionary order, so
+# a chunk's matches across all dictionaries fit in a single int (34 bits)
+_CATEGORY_BITS = tuple(
+    (dict_index, category)
+    for dict_index, keyword_dict in enumerate(_KEYWORD_DICTS)
+    for category in keyword_dict
+)
+_CATEGORY_BIT = {owner: 1 << bit for bit, owner in enumerate(_CATEGORY_BITS)}
+
+# Income ranges (the last dictionary) occupy the top bits; their 4-bit mask
+# indexes a table of the sorted label lists, so no per-chunk sort is needed
+_INCOME_SHIFT = len(_CATEGORY_BITS) - len(_INCOME_KEYWORDS)
+_INCOME_LUT = tuple(
+    tuple(sorted(
+        income_range for bit, income_range in enumerate(_INCOME_KEYWORDS)
+        if income_mask >> bit & 1
+    ))
+    for income_mask in range(1 << len(_INCOME_KEYWORDS))
+)
+
+
+def _owners_mask(keyword_owners: Tuple[Tuple[int, str], ...]) -> int:
+    """OR together the category bits of a keyword's owners"""
+    mask = 0
+    for owner in keyword_owners:
+        mask |= _CATEGORY_BIT[owner]
+    return mask
+
+
+def _build_automaton(keyword_masks: Dict[str, int]) -> "ahocorasick.Automaton":
+    """Build an Aho-Corasick automaton whose values are category bitmasks"""
+    automaton = ahocorasick.Automaton()
+    for keyword, mask in keyword_masks.items():
+        automaton.add_word(keyword, mask)
+    automaton.make_automaton()
+    return automaton
+
+
+@lru_cache(maxsize=1)
+def _matcher_state() -> Tuple[
+    Dict[str, Tuple[Tuple[int, str], ...]],
+    Optional["ahocorasick.Automaton"],
+    Tuple[Tuple[str, int], ...],
+    Tuple[Tuple[str, int], ...]
+]:
+    """
+    Build the keyword matching state once per process
+    
+    Returns:
+        (keyword_index, automaton, single_words, phrases) - matchers carry
+        each keyword's category bitmask. The automaton is None without
+        pyahocorasick, in which case letters-only keywords (single_words)
+        are looked up among a chunk's distinct words and the rest (phrases)
+        searched in the full text
+    """
+    # Inverted index: each distinct keyword is searched once and its hit
+    # fans out to every (dictionary index, category) that lists it
+    keyword_index = _build_keyword_index(_KEYWORD_DICTS)
+    keyword_masks = {
+        keyword: _owners_mask(keyword_owners)
+        for keyword, keyword_owners in keyword_index.items()
+    }
+    
+    if ahocorasick is not None:
+        return keyword_index, _build_automaton(keyword_masks), (), ()
+    
+    single_words = tuple(
+        (keyword, mask) for keyword, mask in keyword_masks.items()
+        if keyword.isalpha()
+    )
+    phrases = tuple(
+        (keyword, mask) for keyword, mask in keyword_masks.items()
+        if not keyword.isalpha()
+    )
+    return keyword_index, None, single_words, phrases
+
+
+@dataclass(slots=True)
 class ChunkMetadata:
     """Enhanced metadata tags for a text chunk"""
     # Hierarchical topics
@@ -29,12 +253,26 @@ class ChunkMetadata:
     # Keywords for hybrid search
     keywords: List[str]
     
-    # Versioning
-    pipeline_version: str = "v1.0"
+    # Versioning (pipeline_version is shared by every chunk, not stored per instance)
+    pipeline_version: ClassVar[str] = "v1.0"
     created_at: str = ""
     
     def to_dict(self) -> Dict:
-        return asdict(self)
+        """
+        Shallow dict (asdict would deep-copy every list and topic dict)
+        
+        Lists and topic dicts are shared with this instance and the tagger's
+        topic_hierarchy - treat them as read-only.
+        """
+        return {
+            'topics': self.topics,
+            'user_types': self.user_types,
+            'sectors': self.sectors,
+            'income_ranges': self.income_ranges,
+            'keywords': self.keywords,
+            'pipeline_version': self.pipeline_version,
+            'created_at': self.created_at,
+        }
 
 
 class MetadataTagger:
@@ -43,122 +281,82 @@ class MetadataTagger:
     Tags chunks for personalized retrieval
     """
     
-    def __init__(self):
-        """Initialize tagger with keyword dictionaries"""
-        
-        # Hierarchical topic structure
-        self.topic_hierarchy = {
-            'tax': {'main': 'Taxation', 'sub': 'Tax Policy'},
-            'income_tax': {'main': 'Taxation', 'sub': 'Income Tax', 'section': 'Personal Tax'},
-            'gst': {'main': 'Taxation', 'sub': 'GST'},
-            'healthcare': {'main': 'Social Welfare', 'sub': 'Healthcare'},
-            'education': {'main': 'Social Welfare', 'sub': 'Education'},
-            'defense': {'main': 'National Security', 'sub': 'Defense'},
-            'agriculture': {'main': 'Economic Development', 'sub': 'Agriculture'},
-            'infrastructure': {'main': 'Economic Development', 'sub': 'Infrastructure'},
-            'employment': {'main': 'Economic Development', 'sub': 'Employment'},
-            'finance': {'main': 'Economic Policy', 'sub': 'Finance'},
-            'social_welfare': {'main': 'Social Welfare', 'sub': 'General Welfare'},
-            'energy': {'main': 'Economic Development', 'sub': 'Energy'},
-            'digital': {'main': 'Technology', 'sub': 'Digital Infrastructure'},
-            'msme': {'main': 'Economic Development', 'sub': 'MSME'}
-        }
+    def __init__(self, cache_size: int = 4096):
+        """
+        Initialize tagger with keyword dictionaries
         
-        # Normalized income ranges (standardized)
-        self.normalized_income_ranges = ['0-5L', '5-10L', '10-15L', '15L+']
-        
-        # Topic keywords
-        self.topic_keywords = {
-            'tax': ['tax', 'taxation', 'income tax', 'gst', 'customs', 'excise', 'duty', 'cess', 
-                   'surcharge', 'rebate', 'deduction', 'exemption', 'section 80', 'tds', 'tcs'],
-            'healthcare': ['health', 'medical', 'hospital', 'ayushman', 'medicine', 'doctor',
-                          'treatment', 'insurance', 'wellness', 'disease', 'vaccine'],
-            'education': ['education', 'school', 'university', 'student', 'scholarship', 'learning',
-                         'skill', 'training', 'research', 'academic'],
-            'defense': ['defense', 'defence', 'military', 'army', 'navy', 'air force', 'security',
-                       'border', 'weapon', 'soldier'],
-            'agriculture': ['agriculture', 'farmer', 'crop', 'farming', 'irrigation', 'fertilizer',
-                           'seed', 'rural', 'kisan', 'mandi', 'minimum support price', 'msp'],
-            'infrastructure': ['infrastructure', 'road', 'highway', 'railway', 'metro', 'airport',
-                              'port', 'bridge', 'construction', 'urban development'],
-            'employment': ['employment', 'job', 'unemployment', 'wage', 'salary', 'epf', 'provident fund',
-                          'pension', 'retirement', 'employee'],
-            'finance': ['finance', 'banking', 'loan', 'credit', 'debt', 'fiscal', 'monetary',
-                       'reserve bank', 'rbi', 'interest rate'],
-            'social_welfare': ['welfare', 'subsidy', 'scheme', 'benefit', 'allowance', 'pension',
-                              'poverty', 'below poverty line', 'bpl'],
-            'energy': ['energy', 'power', 'electricity', 'renewable', 'solar', 'coal', 'oil',
-                      'petroleum', 'gas', 'fuel'],
-            'digital': ['digital', 'technology', 'it', 'software', 'cyber', 'internet', 'online',
-                       'e-governance', 'digital india'],
-            'msme': ['msme', 'small business', 'medium enterprise', 'startup', 'entrepreneur',
-                    'mudra', 'sidbi']
-        }
+        Args:
+            cache_size: Max chunk texts whose tags are remembered (0 disables);
+                        repeated headers/footers are then tagged only once
+        """
+        # Keyword dictionaries are module constants shared by all instances
+        self.topic_hierarchy = _TOPIC_HIERARCHY
+        self.normalized_income_ranges = _NORMALIZED_INCOME_RANGES
+        self.topic_keywords = _TOPIC_KEYWORDS
+        self.user_type_keywords = _USER_TYPE_KEYWORDS
+        self.sector_keywords = _SECTOR_KEYWORDS
+        self.income_keywords = _INCOME_KEYWORDS
         
-        # User type keywords
-        self.user_type_keywords = {
-            'salaried': ['salary', 'salaried', 'employee', 'employer', 'wage', 'profession',
-                        'professional', 'employment', 'tds'],
-            'business': ['business', 'trader', 'entrepreneur', 'proprietor', 'partnership',
-                        'company', 'firm', 'gst', 'turnover'],
-            'senior_citizen': ['senior citizen', 'senior', 'aged', 'elderly', 'pension',
-                              '60 years', '80 years'],
-            'student': ['student', 'education', 'scholarship', 'fee', 'tuition', 'school',
-                       'college', 'university'],
-            'farmer': ['farmer', 'agriculture', 'agricultural income', 'crop', 'kisan'],
-            'woman': ['woman', 'women', 'female', 'maternity', 'maternal', 'girl child',
-                     'beti bachao'],
-            'disabled': ['disabled', 'disability', 'handicapped', 'differently abled', 'pwd'],
-            'nri': ['nri', 'non-resident', 'foreign', 'overseas', 'expatriate']
-        }
+        # Every dictionary is searched in a single pass over the text
+        self._keyword_dicts = _KEYWORD_DICTS
         
-        # Sector keywords
-        self.sector_keywords = {
-            'it': ['information technology', 'software', 'it', 'tech', 'computer', 'digital'],
-            'manufacturing': ['manufacturing', 'industry', 'factory', 'production', 'make in india'],
-            'services': ['service', 'services', 'hospitality', 'tourism', 'consulting'],
-            'agriculture': ['agriculture', 'farming', 'agri', 'crop', 'livestock'],
-            'healthcare': ['healthcare', 'medical', 'pharmaceutical', 'hospital', 'clinical'],
-            'education': ['education', 'educational', 'school', 'coaching', 'training'],
-            'real_estate': ['real estate', 'property', 'housing', 'construction', 'builder'],
-            'finance': ['banking', 'finance', 'insurance', 'investment', 'nbfc'],
-            'retail': ['retail', 'shop', 'store', 'mall', 'e-commerce'],
-            'transport': ['transport', 'logistics', 'shipping', 'delivery', 'courier']
-        }
+        # Index and automaton are built once per process (see _matcher_state)
+        (
+            self._keyword_index,
+            self._automaton,
+            self._single_words,
+            self._phrases
+        ) = _matcher_state()
         
-        # Normalized income range keywords (INR in lakhs)
-        self.income_keywords = {
-            '0-5L': ['up to', 'below 5 lakh', 'less than 5 lakh', 'upto 5 lakh',
-                    'not exceeding 5 lakh', '2.5 lakh', '3 lakh', '5 lakh'],
-            '5-10L': ['5 lakh to 10 lakh', '7 lakh', '7.5 lakh', '10 lakh',
-                     'between 5 and 10 lakh', 'above 5 lakh', 'exceeding 5 lakh'],
-            '10-15L': ['10 lakh to 15 lakh', '12 lakh', '12.5 lakh', '15 lakh',
-                      'between 10 and 15 lakh', 'above 10 lakh'],
-            '15L+': ['above 15 lakh', 'exceeding 15 lakh', '20 lakh', '50 lakh', '1 crore',
-                    'more than 15 lakh', 'super rich', 'high income']
-        }
+        # LRU of chunk text -> ChunkMetadata
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, ChunkMetadata]" = OrderedDict()
         
         logger.info("Initialized MetadataTagger with keyword dictionaries")
     
-    def _find_matches(self, text: str, keyword_dict: Dict[str, List[str]]) -> List[str]:
+    def _match_all(self, text_lower: str) -> List[List[str]]:
         """
-        Find which categories match based on keywords
+        Find matching categories for every keyword dictionary in one pass
+        
+        A category matches if any of its keywords occurs as a substring.
         
         Args:
-            text: Text to search
-            keyword_dict: Dictionary of category -> keywords
-            
+            text_lower: Already-lowercased text to search
+        
         Returns:
-            List of matching categories
+            One list of matching categories per dictionary in _keyword_dicts,
+            in dictionary order (income ranges sorted)
         """
-        text_lower = text.lower()
-        matches = []
+        # OR each hit's category bits into one mask
+        mask = 0
         
-        for category, keywords in keyword_dict.items():
-            for keyword in keywords:
-                if keyword in text_lower:
-                    matches.append(category)
-                    break  # Found match for this category
+        if self._automaton is not None:
+            for _, keyword_mask in self._automaton.iter(text_lower):
+                mask |= keyword_mask
+        else:
+            # Whole-word set lookup first, then a substring search over the
+            # (much shorter) joined distinct words; phrases use the full text
+            words = set(_LETTERS_RE.findall(text_lower))
+            words_text = ' '.join(words)
+            
+            for keyword, keyword_mask in self._single_words:
+                if keyword in words or keyword in words_text:
+                    mask |= keyword_mask
+            
+            for phrase, keyword_mask in self._phrases:
+                if phrase in text_lower:
+                    mask |= keyword_mask
+        
+        # Decode set bits lowest first, i.e. in dictionary order; income
+        # ranges come pre-sorted from the lookup table
+        matches: List[List[str]] = [[] for _ in self._keyword_dicts]
+        matches[-1] = list(_INCOME_LUT[mask >> _INCOME_SHIFT])
+        mask &= (1 << _INCOME_SHIFT) - 1
+        while mask:
+            lowest = mask & -mask
+            dict_index, category = _CATEGORY_BITS[lowest.bit_length() - 1]
+            matches[dict_index].append(category)
+            mask ^= lowest
         
         return matches
     
@@ -168,7 +366,7 @@ class MetadataTagger:
         
         Args:
             flat_topics: List of flat topic names
-            
+        
         Returns:
             List of hierarchical topic dictionaries
         """
@@ -186,51 +384,47 @@ class MetadataTagger:
         
         return hierarchical
     
-    def _extract_keywords(self, text: str, top_n: int = 10) -> List[str]:
+    def _extract_keywords(self, text_lower: str, top_n: int = 10) -> List[str]:
         """
-        Extract important keywords from text
+        Extract important keywords from already-lowercased text
         Simple frequency-based extraction
         """
-        # Remove common stop words
-        stop_words = {
-            'the', 'be', 'to', 'of', 'and', 'a', 'in', 'that', 'have', 'i',
-            'it', 'for', 'not', 'on', 'with', 'he', 'as', 'you', 'do', 'at',
-            'this', 'but', 'his', 'by', 'from', 'they', 'we', 'say', 'her', 'she',
-            'or', 'an', 'will', 'my', 'one', 'all', 'would', 'there', 'their',
-            'is', 'are', 'was', 'were', 'been', 'has', 'had', 'can', 'may', 'shall'
-        }
+        # Words of 4+ letters (shorter ones were always filtered out)
+        words = _WORD_RE.findall(text_lower)
         
-        # Extract words
-        words = re.findall(r'\b[a-z]{3,}\b', text.lower())
-        
-        # Filter and count
-        word_freq = {}
-        for word in words:
-            if word not in stop_words and len(word) > 3:
-                word_freq[word] = word_freq.get(word, 0) + 1
+        # Count, skipping stop words; most_common keeps first-seen order on ties
+        word_freq = Counter(word for word in words if word not in _STOP_WORDS)
         
         # Get top N
-        sorted_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
-        return [word for word, freq in sorted_words[:top_n]]
+        return [word for word, freq in word_freq.most_common(top_n)]
     
-    def tag_chunk(self, chunk_text: str) -> ChunkMetadata:
+    def tag_chunk(self, chunk_text: str, created_at: Optional[str] = None) -> ChunkMetadata:
         """
         Tag a text chunk with enhanced metadata
         
         Args:
             chunk_text: Text to tag
-            
+            created_at: Timestamp to record (default: now); batches pass one shared value
+        
         Returns:
             ChunkMetadata object with hierarchical topics
         """
-        from datetime import datetime
+        created_at = created_at or datetime.now().isoformat()
+        
+        # Identical text (boilerplate headers/footers) is tagged only once
+        cached = self._cache.get(chunk_text)
+        if cached is not None:
+            self._cache.move_to_end(chunk_text)
+            if cached.created_at == created_at:
+                return cached
+            return replace(cached, created_at=created_at)
+        
+        # Lowercase once; every matcher below works on the lowered text
+        text_lower = chunk_text.lower()
         
-        # Find flat matches first
-        flat_topics = self._find_matches(chunk_text, self.topic_keywords)
-        user_types = self._find_matches(chunk_text, self.user_type_keywords)
-        sectors = self._find_matches(chunk_text, self.sector_keywords)
-        income_ranges = self._find_matches(chunk_text, self.income_keywords)
-        keywords = self._extract_keywords(chunk_text)
+        # Find flat matches first (all dictionaries in a single scan)
+        flat_topics, user_types, sectors, income_ranges = self._match_all(text_lower)
+        keywords = self._extract_keywords(text_lower)
         
         # Convert to hierarchical topics
         hierarchical_topics = self._to_hierarchical_topics(flat_topics)
@@ -239,15 +433,27 @@ class MetadataTagger:
         if not hierarchical_topics:
             hierarchical_topics = [{'main': 'General', 'sub': 'Uncategorized'}]
         
-        return ChunkMetadata(
+        metadata = ChunkMetadata(
             topics=hierarchical_topics,
             user_types=user_types,
             sectors=sectors,
-            income_ranges=sorted(income_ranges),  # Sort for consistency
+            income_ranges=income_ranges,  # Already sorted for consistency
             keywords=keywords,
-            pipeline_version="v1.0",
-            created_at=datetime.now().isoformat()
+            created_at=created_at
         )
+        self._remember(chunk_text, metadata)
+        
+        return metadata
+    
+    def _remember(self, chunk_text: str, metadata: ChunkMetadata):
+        """Store tags in the LRU cache, evicting the oldest entry"""
+        if self.cache_size <= 0:
+            return
+        
+        self._cache[chunk_text] = metadata
+        self._cache.move_to_end(chunk_text)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
     
     def tag_chunks(self, chunks: List) -> List[Dict]:
         """
@@ -255,7 +461,7 @@ class MetadataTagger:
         
         Args:
             chunks: List of TextChunk objects
-            
+        
         Returns:
             List of dictionaries with chunk data + metadata
         """
@@ -266,8 +472,11 @@ class MetadataTagger:
         
         result = []
         
+        # One timestamp for the whole batch
+        created_at = datetime.now().isoformat()
+        
         for chunk in chunks:
-            metadata = self.tag_chunk(chunk.text)
+            metadata = self.tag_chunk(chunk.text, created_at=created_at)
             
             # Combine chunk data with metadata
             chunk_with_metadata = {
@@ -277,26 +486,28 @@ class MetadataTagger:
             
             result.append(chunk_with_metadata)
         
-        # Log statistics
-        all_topics = set()
-        all_user_types = set()
-        
-        for item in result:
-            # Extract main topics from hierarchical structure
-            for topic in item['metadata']['topics']:
-                all_topics.add(topic.get('main', 'General'))
-            all_user_types.update(item['metadata']['user_types'])
-        
-        logger.info(
-            "Metadata tagging completed",
-            extra=log_extra(
-                chunks_tagged=len(result),
-                unique_topics=len(all_topics),
-                unique_user_types=len(all_user_types),
-                topics=list(all_topics),
-                user_types=list(all_user_types)
+        # Log statistics (a full pass over the result, so skip it when
+        # INFO is off)
+        if logger.isEnabledFor(logging.INFO):
+            all_topics = set()
+            all_user_types = set()
+            
+            for item in result:
+                # Extract main topics from hierarchical structure
+                for topic in item['metadata']['topics']:
+                    all_topics.add(topic.get('main', 'General'))
+                all_user_types.update(item['metadata']['user_types'])
+            
+            logger.info(
+                "Metadata tagging completed",
+                extra=log_extra(
+                    chunks_tagged=len(result),
+                    unique_topics=len(all_topics),
+                    unique_user_types=len(all_user_types),
+                    topics=list(all_topics),
+                    user_types=list(all_user_types)
+                )
             )
-        )
         
         return result
 
@@ -308,7 +519,7 @@ def tag_document_chunks(chunks_by_doc: Dict[str, List]) -> Dict[str, List[Dict]]
     
     Args:
         chunks_by_doc: Dictionary mapping filename to list of chunks
-        
+    
     Returns:
         Dictionary mapping filename to list of tagged chunks
     """
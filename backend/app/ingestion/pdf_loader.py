@@ -8,15 +8,24 @@ from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass, asdict
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
 import hashlib
+import mmap
+import os
 
 from ..core.config import settings
 from ..core.logger import setup_logger, log_extra
 
 logger = setup_logger(__name__)
 
+# Default flags for plain-text extraction, resolved once
+_TEXT_FLAGS = fitz.TEXTFLAGS_TEXT
 
-@dataclass
+# Bytes per sha256 update when hashing a memory-mapped file
+_HASH_CHUNK_SIZE = 64 * 1024 * 1024
+
+
+@dataclass(slots=True)
 class PageContent:
     """Represents content from a single PDF page"""
     page_number: int
@@ -27,7 +36,32 @@ class PageContent:
     has_images: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
+class PageTotals:
+    """Document totals, accumulated as pages are extracted"""
+    total_chars: int = 0
+    total_words: int = 0
+    pages_with_images: int = 0
+    pages_with_tables: int = 0
+    
+    def add(self, page: PageContent):
+        """Count a page into the totals"""
+        self.total_chars += page.char_count
+        self.total_words += page.word_count
+        self.pages_with_images += page.has_images
+        self.pages_with_tables += page.has_tables
+    
+    def summary(self) -> Dict:
+        """Document-level totals (already accumulated - no pass over pages)"""
+        return {
+            "total_chars": self.total_chars,
+            "total_words": self.total_words,
+            "pages_with_images": self.pages_with_images,
+            "pages_with_tables": self.pages_with_tables,
+        }
+
+
+@dataclass(slots=True)
 class PDFDocument:
     """Represents a complete PDF document with metadata"""
     filename: str
@@ -68,65 +102,94 @@ class PDFLoader:
         )
     
     def _calculate_file_hash(self, file_path: Path) -> str:
-        """Calculate SHA256 hash of file for integrity checking"""
-        sha256_hash = hashlib.sha256()
+        """
+        Calculate SHA256 hash of file for integrity checking
+        
+        The file is memory-mapped and fed to OpenSSL in zero-copy slices
+        straight from the page cache (hashing releases the GIL)
+        """
+        sha256 = hashlib.sha256()
+        
         with open(file_path, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(byte_block)
-        return sha256_hash.hexdigest()
+            # mmap cannot map an empty file
+            if os.fstat(f.fileno()).st_size == 0:
+                return sha256.hexdigest()
+            
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                view = memoryview(mm)
+                try:
+                    for offset in range(0, len(view), _HASH_CHUNK_SIZE):
+                        sha256.update(view[offset:offset + _HASH_CHUNK_SIZE])
+                finally:
+                    view.release()
+        
+        return sha256.hexdigest()
     
-    def _validate_pdf(self, file_path: Path) -> Tuple[bool, Optional[str]]:
+    def _validate_pdf(
+        self,
+        file_path: Path
+    ) -> Tuple[bool, Optional[str], Optional[fitz.Document]]:
         """
         Validate PDF file before processing
         
         Returns:
-            (is_valid, error_message)
+            (is_valid, error_message, open_document)
+            The document opened for validation is returned so extraction
+            can reuse it instead of parsing the file again; the caller
+            must close it.
         """
         # Check file exists
         if not file_path.exists():
-            return False, f"File not found: {file_path}"
+            return False, f"File not found: {file_path}", None
         
         # Check file extension
         if file_path.suffix.lower() not in settings.SUPPORTED_PDF_EXTENSIONS:
-            return False, f"Unsupported file type: {file_path.suffix}"
+            return False, f"Unsupported file type: {file_path.suffix}", None
         
         # Check file size
         file_size_mb = file_path.stat().st_size / (1024 * 1024)
         if file_size_mb > settings.MAX_PDF_SIZE_MB:
-            return False, f"File too large: {file_size_mb:.2f}MB (max: {settings.MAX_PDF_SIZE_MB}MB)"
+            return False, f"File too large: {file_size_mb:.2f}MB (max: {settings.MAX_PDF_SIZE_MB}MB)", None
         
         # Try to open with PyMuPDF to verify it's a valid PDF
         try:
             doc = fitz.open(file_path)
-            doc.close()
         except Exception as e:
-            return False, f"Invalid or corrupted PDF: {str(e)}"
+            return False, f"Invalid or corrupted PDF: {str(e)}", None
         
-        return True, None
+        return True, None, doc
     
-    def _extract_with_pymupdf(self, file_path: Path) -> List[PageContent]:
+    def _extract_with_pymupdf(
+        self,
+        file_path: Path,
+        doc: Optional[fitz.Document] = None
+    ) -> Tuple[List[PageContent], PageTotals]:
         """
         Extract text using PyMuPDF (primary method)
         
         Args:
             file_path: Path to PDF file
-            
+            doc: Already-open document (left open); opened here if not given
+        
         Returns:
-            List of PageContent objects
+            (PageContent objects, document totals)
         """
         pages = []
+        totals = PageTotals()
+        owns_doc = doc is None
         
         try:
-            doc = fitz.open(file_path)
+            if owns_doc:
+                doc = fitz.open(file_path)
             
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                
+            for page_num, page in enumerate(doc):
                 # Extract text
-                text = page.get_text("text")
+                text = page.get_text("text", flags=_TEXT_FLAGS)
                 
-                # Get metadata
-                has_images = len(page.get_images()) > 0
+                # Get metadata (get_images only reads the page's resource
+                # list - far cheaper than get_image_info, which renders the
+                # display list)
+                has_images = bool(page.get_images())
                 
                 # Create page content
                 page_content = PageContent(
@@ -139,13 +202,13 @@ class PDFLoader:
                 )
                 
                 pages.append(page_content)
+                totals.add(page_content)
             
-            doc.close()
             logger.debug(
                 f"PyMuPDF extraction successful",
                 extra=log_extra(file=file_path.name, pages=len(pages))
             )
-            
+        
         except Exception as e:
             logger.error(
                 f"PyMuPDF extraction failed: {str(e)}",
@@ -154,20 +217,28 @@ class PDFLoader:
             )
             raise
         
-        return pages
+        finally:
+            if owns_doc and doc is not None:
+                doc.close()
+        
+        return pages, totals
     
-    def _extract_with_pdfplumber(self, file_path: Path) -> List[PageContent]:
+    def _extract_with_pdfplumber(
+        self,
+        file_path: Path
+    ) -> Tuple[List[PageContent], PageTotals]:
         """
         Extract text using pdfplumber (fallback method)
         Better for complex layouts and table detection
         
         Args:
             file_path: Path to PDF file
-            
+        
         Returns:
-            List of PageContent objects
+            (PageContent objects, document totals)
         """
         pages = []
+        totals = PageTotals()
         
         try:
             with pdfplumber.open(file_path) as pdf:
@@ -175,9 +246,9 @@ class PDFLoader:
                     # Extract text
                     text = page.extract_text() or ""
                     
-                    # Detect tables
-                    tables = page.extract_tables()
-                    has_tables = len(tables) > 0
+                    # Detect tables (find_tables locates them without
+                    # extracting cell text - only the flag is needed)
+                    has_tables = bool(page.find_tables())
                     
                     # Detect images
                     has_images = len(page.images) > 0
@@ -193,12 +264,13 @@ class PDFLoader:
                     )
                     
                     pages.append(page_content)
+                    totals.add(page_content)
             
             logger.debug(
                 f"pdfplumber extraction successful",
                 extra=log_extra(file=file_path.name, pages=len(pages))
             )
-            
+        
         except Exception as e:
             logger.error(
                 f"pdfplumber extraction failed: {str(e)}",
@@ -207,7 +279,7 @@ class PDFLoader:
             )
             raise
         
-        return pages
+        return pages, totals
     
     def load_pdf(
         self,
@@ -220,7 +292,7 @@ class PDFLoader:
         Args:
             file_path: Path to PDF file
             use_fallback: Whether to use pdfplumber if PyMuPDF fails
-            
+        
         Returns:
             PDFDocument object or None if extraction fails
         """
@@ -231,8 +303,8 @@ class PDFLoader:
             extra=log_extra(file=file_path.name)
         )
         
-        # Validate PDF
-        is_valid, error_msg = self._validate_pdf(file_path)
+        # Validate PDF (keeps the parsed document open for extraction)
+        is_valid, error_msg, doc = self._validate_pdf(file_path)
         if not is_valid:
             logger.error(
                 f"PDF validation failed: {error_msg}",
@@ -240,6 +312,19 @@ class PDFLoader:
             )
             return None
         
+        try:
+            return self._load_validated_pdf(file_path, doc, start_time, use_fallback)
+        finally:
+            doc.close()
+    
+    def _load_validated_pdf(
+        self,
+        file_path: Path,
+        doc: fitz.Document,
+        start_time: datetime,
+        use_fallback: bool
+    ) -> Optional[PDFDocument]:
+        """Hash and extract a PDF that passed validation (see load_pdf)"""
         # Calculate file hash
         file_hash = self._calculate_file_hash(file_path)
         
@@ -248,7 +333,7 @@ class PDFLoader:
         pages = None
         
         try:
-            pages = self._extract_with_pymupdf(file_path)
+            pages, totals = self._extract_with_pymupdf(file_path, doc)
         except Exception as e:
             logger.warning(
                 f"PyMuPDF failed, attempting fallback",
@@ -258,7 +343,7 @@ class PDFLoader:
             if use_fallback:
                 try:
                     extraction_method = "pdfplumber"
-                    pages = self._extract_with_pdfplumber(file_path)
+                    pages, totals = self._extract_with_pdfplumber(file_path)
                 except Exception as fallback_error:
                     logger.error(
                         f"Both extraction methods failed",
@@ -297,12 +382,7 @@ class PDFLoader:
             processing_time_seconds=round(processing_time, 2),
             file_hash=file_hash,
             extracted_at=datetime.now().isoformat(),
-            metadata={
-                "total_chars": sum(p.char_count for p in pages),
-                "total_words": sum(p.word_count for p in pages),
-                "pages_with_images": sum(1 for p in pages if p.has_images),
-                "pages_with_tables": sum(1 for p in pages if p.has_tables),
-            }
+            metadata=totals.summary()
         )
         
         logger.info(
@@ -318,10 +398,17 @@ class PDFLoader:
         
         return pdf_doc
     
-    def load_all_pdfs(self) -> List[PDFDocument]:
+    def load_all_pdfs(self, max_workers: Optional[int] = None) -> List[PDFDocument]:
         """
         Load all PDF files from documents directory
         
+        Files are loaded in parallel worker processes (hashing and PyMuPDF
+        extraction are CPU-bound); results keep the directory order.
+        
+        Args:
+            max_workers: Worker processes (default: one per CPU, capped at
+                         the number of files; 1 loads sequentially in-process)
+        
         Returns:
             List of successfully loaded PDFDocument objects
         """
@@ -330,8 +417,25 @@ class PDFLoader:
             extra=log_extra(directory=str(self.documents_dir))
         )
         
-        # Find all PDF files
-        pdf_files = list(self.documents_dir.glob("*.pdf"))
+        # Find all PDF files in one directory scan (any extension case);
+        # DirEntry caches stat, so oversized files are dropped here too
+        pdf_files = []
+        oversized_files = []
+        max_bytes = settings.MAX_PDF_SIZE_MB * 1024 * 1024
+        with os.scandir(self.documents_dir) as entries:
+            for entry in entries:
+                if not entry.is_file() or not entry.name.lower().endswith(".pdf"):
+                    continue
+                if entry.stat().st_size > max_bytes:
+                    oversized_files.append(entry.name)
+                    continue
+                pdf_files.append(Path(entry.path))
+        
+        if oversized_files:
+            logger.warning(
+                f"Skipping PDF files over {settings.MAX_PDF_SIZE_MB}MB",
+                extra=log_extra(files=oversized_files)
+            )
         
         if not pdf_files:
             logger.warning(
@@ -349,9 +453,14 @@ class PDFLoader:
         documents = []
         failed_files = []
         
-        for pdf_file in pdf_files:
-            pdf_doc = self.load_pdf(pdf_file)
-            
+        workers = min(max_workers or os.cpu_count() or 1, len(pdf_files))
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                loaded = list(executor.map(self.load_pdf, pdf_files))
+        else:
+            loaded = [self.load_pdf(pdf_file) for pdf_file in pdf_files]
+        
+        for pdf_file, pdf_doc in zip(pdf_files, loaded):
             if pdf_doc:
                 documents.append(pdf_doc)
             else:
@@ -2,8 +2,11 @@
 Text splitter for Budget 2026 AI Platform
 Chunks documents into semantic pieces while preserving context
 """
-from typing import List, Dict, Optional
-from dataclasses import dataclass, asdict
+from typing import Dict, Iterator, List, Optional, Tuple
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+import logging
+import os
 import re
 
 from ..core.config import settings
@@ -11,8 +14,37 @@ from ..core.logger import setup_logger, log_extra
 
 logger = setup_logger(__name__)
 
+# Abbreviations whose trailing period must not end a sentence
+_ABBREVIATION_RE = re.compile(r'\b(Dr|Mr|Mrs|Ms|No|vs|etc|i\.e|e\.g)\.')
+_ABBREVIATION_SENTINEL = '\x00'
+_ABBREVIATION_SUB = r'\1' + _ABBREVIATION_SENTINEL
 
-@dataclass
+# Sentence boundary: . ! ? followed by space and capital letter or number
+_SENTENCE_BOUNDARY_RE = re.compile(r'(?<=[.!?])\s+(?=[A-Z0-9])')
+
+# Rough token estimate: 1 token ≈ 4 characters for English text
+_CHARS_PER_TOKEN = 4
+
+# Quality scoring: ASCII bytes that are not letters, and non-ASCII runs
+_ASCII_NON_ALPHA = bytes(b for b in range(128) if not chr(b).isalpha())
+_NON_ASCII_RE = re.compile(r'[^\x00-\x7f]+')
+
+
+def _count_alpha(text: str) -> int:
+    """
+    Count alphabetic characters (same as sum(c.isalpha() for c in text))
+    
+    ASCII letters are counted by deleting everything else with
+    bytes.translate; only the (rare) non-ASCII characters are tested
+    one by one.
+    """
+    count = len(text.encode('ascii', 'ignore').translate(None, _ASCII_NON_ALPHA))
+    if not text.isascii():
+        count += sum(map(str.isalpha, ''.join(_NON_ASCII_RE.findall(text))))
+    return count
+
+
+@dataclass(slots=True)
 class TextChunk:
     """Represents a chunk of text with metadata"""
     chunk_id: str
@@ -26,8 +58,18 @@ class TextChunk:
     quality_score: float = 1.0  # 0-1 score for chunk quality
     
     def to_dict(self) -> Dict:
-        """Convert to dictionary"""
-        return asdict(self)
+        """Convert to dictionary (all fields are scalars, no deep copy needed)"""
+        return {
+            'chunk_id': self.chunk_id,
+            'document_name': self.document_name,
+            'page_number': self.page_number,
+            'chunk_index': self.chunk_index,
+            'text': self.text,
+            'char_count': self.char_count,
+            'word_count': self.word_count,
+            'token_count': self.token_count,
+            'quality_score': self.quality_score,
+        }
 
 
 class SemanticTextSplitter:
@@ -64,7 +106,7 @@ class SemanticTextSplitter:
             )
         )
     
-    def _calculate_quality_score(self, text: str) -> float:
+    def _calculate_quality_score(self, text: str, words: Optional[List[str]] = None) -> float:
         """
         Calculate quality score for a chunk (0-1)
         
@@ -73,14 +115,22 @@ class SemanticTextSplitter:
         - Alphabetic content ratio
         - Has numeric content (good for budget data)
         - Average word length (filters gibberish)
+        
+        Args:
+            text: Chunk text
+            words: text.split(), if the caller already has it
         """
         if not text:
             return 0.0
         
         score = 1.0
         
+        # Split once; word count and word lengths both come from it
+        if words is None:
+            words = text.split()
+        
         # 1. Length penalty/bonus
-        word_count = len(text.split())
+        word_count = len(words)
         if word_count < 20:
             score *= 0.5  # Too short
         elif word_count < 50:
@@ -89,7 +139,7 @@ class SemanticTextSplitter:
             score *= 0.9  # Very long, might be too broad
         
         # 2. Alphabetic content
-        alpha_chars = sum(1 for c in text if c.isalpha())
+        alpha_chars = _count_alpha(text)
         alpha_ratio = alpha_chars / len(text) if len(text) > 0 else 0
         if alpha_ratio < 0.4:
             score *= 0.6  # Likely OCR noise or tables
@@ -97,14 +147,13 @@ class SemanticTextSplitter:
             score *= 1.0  # Good text
         
         # 3. Has numbers (good for budget data)
-        has_numbers = any(c.isdigit() for c in text)
+        has_numbers = any(map(str.isdigit, text))
         if has_numbers:
             score = min(1.0, score * 1.1)  # Slight bonus
         
         # 4. Average word length (detect gibberish)
-        words = text.split()
         if words:
-            avg_word_len = sum(len(w) for w in words) / len(words)
+            avg_word_len = len(''.join(words)) / word_count
             if avg_word_len < 2 or avg_word_len > 20:
                 score *= 0.7  # Suspicious
         
@@ -115,86 +164,76 @@ class SemanticTextSplitter:
         Estimate token count (rough approximation)
         1 token ≈ 4 characters for English text
         """
-        return len(text) // 4
+        return len(text) // _CHARS_PER_TOKEN
     
     def _split_into_sentences(self, text: str) -> List[str]:
         """
         Split text into sentences using smart regex
         Handles common abbreviations
         """
-        # Common abbreviations that shouldn't split
-        text = re.sub(r'\bDr\.', 'Dr', text)
-        text = re.sub(r'\bMr\.', 'Mr', text)
-        text = re.sub(r'\bMrs\.', 'Mrs', text)
-        text = re.sub(r'\bMs\.', 'Ms', text)
-        text = re.sub(r'\bNo\.', 'No', text)
-        text = re.sub(r'\bvs\.', 'vs', text)
-        text = re.sub(r'\betc\.', 'etc', text)
-        text = re.sub(r'\bi\.e\.', 'ie', text)
-        text = re.sub(r'\be\.g\.', 'eg', text)
+        # Common abbreviations that shouldn't split: swap their final period
+        # for a sentinel so the boundary regex can't see it
+        text = _ABBREVIATION_RE.sub(_ABBREVIATION_SUB, text)
         
         # Split on sentence boundaries
         # Look for: . ! ? followed by space and capital letter or number
-        sentences = re.split(r'(?<=[.!?])\s+(?=[A-Z0-9])', text)
+        sentences = _SENTENCE_BOUNDARY_RE.split(text)
         
         # Restore abbreviations
-        sentences = [s.replace('Dr ', 'Dr. ')
-                       .replace('Mr ', 'Mr. ')
-                       .replace('Mrs ', 'Mrs. ')
-                       .replace('Ms ', 'Ms. ')
-                       .replace('No ', 'No. ')
-                       .replace('vs ', 'vs. ')
-                       .replace('etc ', 'etc. ')
-                       .replace('ie ', 'i.e. ')
-                       .replace('eg ', 'e.g. ')
-                     for s in sentences]
-        
-        return [s.strip() for s in sentences if s.strip()]
+        sentences = [s.replace(_ABBREVIATION_SENTINEL, '.').strip() for s in sentences]
+        
+        return [s for s in sentences if s]
     
     def _create_chunks_from_sentences(
         self,
-        sentences: List[str]
+        sentences: List[str],
+        sentence_tokens: Optional[List[int]] = None
     ) -> List[str]:
         """
         Combine sentences into chunks respecting size limits and overlap
+        
+        Args:
+            sentences: Sentences in order
+            sentence_tokens: Token estimate per sentence (computed if not given)
         """
+        if sentence_tokens is None:
+            sentence_tokens = [len(sentence) // _CHARS_PER_TOKEN for sentence in sentences]
+        
         chunks = []
-        current_chunk = []
+        # (sentence, tokens) pairs, so the overlap walk reuses the estimates
+        current_chunk: List[Tuple[str, int]] = []
         current_tokens = 0
         
-        for sentence in sentences:
-            sentence_tokens = self._estimate_tokens(sentence)
-            
+        for sentence, tokens in zip(sentences, sentence_tokens):
             # If adding this sentence exceeds chunk size
-            if current_tokens + sentence_tokens > self.chunk_size and current_chunk:
+            if current_tokens + tokens > self.chunk_size and current_chunk:
                 # Save current chunk
-                chunks.append(' '.join(current_chunk))
+                chunks.append(' '.join(sent for sent, _ in current_chunk))
                 
                 # Start new chunk with overlap
                 # Keep last few sentences for context
                 overlap_tokens = 0
-                overlap_sentences = []
+                overlap_start = len(current_chunk)
                 
-                for sent in reversed(current_chunk):
-                    sent_tokens = self._estimate_tokens(sent)
-                    if overlap_tokens + sent_tokens <= self.chunk_overlap:
-                        overlap_sentences.insert(0, sent)
-                        overlap_tokens += sent_tokens
-                    else:
+                while overlap_start > 0:
+                    sent_tokens = current_chunk[overlap_start - 1][1]
+                    if overlap_tokens + sent_tokens > self.chunk_overlap:
                         break
+                    overlap_tokens += sent_tokens
+                    overlap_start -= 1
                 
-                current_chunk = overlap_sentences
+                current_chunk = current_chunk[overlap_start:]
                 current_tokens = overlap_tokens
             
             # Add sentence to current chunk
-            current_chunk.append(sentence)
-            current_tokens += sentence_tokens
+            current_chunk.append((sentence, tokens))
+            current_tokens += tokens
         
         # Don't forget the last chunk
         if current_chunk:
-            chunk_text = ' '.join(current_chunk)
+            chunk_text = ' '.join(sent for sent, _ in current_chunk)
             # Only add if it meets minimum size
-            if self._estimate_tokens(chunk_text) >= self.min_chunk_size // 4:
+            if len(chunk_text) // _CHARS_PER_TOKEN >= self.min_chunk_size // _CHARS_PER_TOKEN:
                 chunks.append(chunk_text)
         
         return chunks
@@ -205,7 +244,7 @@ class SemanticTextSplitter:
         
         Args:
             text: Input text to split
-            
+        
         Returns:
             List of text chunks
         """
@@ -221,8 +260,10 @@ class SemanticTextSplitter:
         if not sentences:
             return []
         
-        # Create chunks from sentences
-        chunks = self._create_chunks_from_sentences(sentences)
+        # Create chunks from sentences (token estimates computed once, inline
+        # rather than through _estimate_tokens to skip a call per sentence)
+        sentence_tokens = [len(sentence) // _CHARS_PER_TOKEN for sentence in sentences]
+        chunks = self._create_chunks_from_sentences(sentences, sentence_tokens)
         
         return chunks
     
@@ -241,7 +282,7 @@ class SemanticTextSplitter:
             page_number: Page number in document
             page_text: Text content of page
             start_chunk_index: Starting index for chunks
-            
+        
         Returns:
             List of TextChunk objects
         """
@@ -252,16 +293,20 @@ class SemanticTextSplitter:
             chunk_index = start_chunk_index + i
             chunk_id = f"{document_name}_p{page_number}_c{chunk_index}"
             
+            # Split once for the word count and the quality score
+            words = chunk_text.split()
+            char_count = len(chunk_text)
+            
             chunk = TextChunk(
                 chunk_id=chunk_id,
                 document_name=document_name,
                 page_number=page_number,
                 chunk_index=chunk_index,
                 text=chunk_text,
-                char_count=len(chunk_text),
-                word_count=len(chunk_text.split()),
-                token_count=self._estimate_tokens(chunk_text),
-                quality_score=self._calculate_quality_score(chunk_text)
+                char_count=char_count,
+                word_count=len(words),
+                token_count=char_count // _CHARS_PER_TOKEN,
+                quality_score=self._calculate_quality_score(chunk_text, words)
             )
             
             result.append(chunk)
@@ -271,15 +316,18 @@ class SemanticTextSplitter:
     def chunk_document(
         self,
         pdf_document
-    ) -> List[TextChunk]:
+    ) -> Iterator[TextChunk]:
         """
-        Chunk an entire PDF document
+        Chunk an entire PDF document, yielding chunks page by page
+        
+        Only one page's chunks are held at a time; wrap in list() when the
+        whole document is needed.
         
         Args:
             pdf_document: PDFDocument object from pdf_loader
-            
-        Returns:
-            List of all TextChunk objects from document
+        
+        Yields:
+            TextChunk objects in document order
         """
         logger.info(
             f"Chunking document: {pdf_document.filename}",
@@ -289,8 +337,10 @@ class SemanticTextSplitter:
             )
         )
         
-        all_chunks = []
         chunk_counter = 0
+        total_chunk_words = 0
+        # The word total only feeds the summary log line
+        log_stats = logger.isEnabledFor(logging.INFO)
         
         for page in pdf_document.pages:
             page_chunks = self.chunk_page(
@@ -300,38 +350,59 @@ class SemanticTextSplitter:
                 start_chunk_index=chunk_counter
             )
             
-            all_chunks.extend(page_chunks)
             chunk_counter += len(page_chunks)
-        
-        logger.info(
-            f"Document chunking completed: {pdf_document.filename}",
-            extra=log_extra(
-                chunks_created=len(all_chunks),
-                avg_chunk_words=sum(c.word_count for c in all_chunks) // len(all_chunks) if all_chunks else 0
+            if log_stats:
+                total_chunk_words += sum(c.word_count for c in page_chunks)
+            yield from page_chunks
+        
+        if log_stats:
+            logger.info(
+                f"Document chunking completed: {pdf_document.filename}",
+                extra=log_extra(
+                    chunks_created=chunk_counter,
+                    avg_chunk_words=total_chunk_words // chunk_counter if chunk_counter else 0
+                )
             )
-        )
-        
-        return all_chunks
+    
+    def chunk_document_list(self, pdf_document) -> List[TextChunk]:
+        """All chunks of a document as a list (picklable, for worker processes)"""
+        return list(self.chunk_document(pdf_document))
 
 
 # Convenience function
-def chunk_documents(pdf_documents: List) -> Dict[str, List[TextChunk]]:
+def chunk_documents(
+    pdf_documents: List,
+    max_workers: Optional[int] = None,
+    splitter: Optional[SemanticTextSplitter] = None
+) -> Dict[str, List[TextChunk]]:
     """
     Chunk multiple PDF documents
     
+    Documents are chunked in parallel worker processes (splitting is
+    CPU-bound Python); results keep the input order.
+    
     Args:
         pdf_documents: List of PDFDocument objects
-        
+        max_workers: Worker processes (default: one per CPU, capped at
+                     the number of documents; 1 chunks sequentially in-process)
+        splitter: Splitter to use (default: SemanticTextSplitter())
+    
     Returns:
         Dictionary mapping filename to list of chunks
     """
-    splitter = SemanticTextSplitter()
+    splitter = splitter or SemanticTextSplitter()
     
     result = {}
     total_chunks = 0
     
-    for doc in pdf_documents:
-        chunks = splitter.chunk_document(doc)
+    workers = min(max_workers or os.cpu_count() or 1, len(pdf_documents))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunked = list(executor.map(splitter.chunk_document_list, pdf_documents))
+    else:
+        chunked = [splitter.chunk_document_list(doc) for doc in pdf_documents]
+    
+    for doc, chunks in zip(pdf_documents, chunked):
         result[doc.filename] = chunks
         total_chunks += len(chunks)
     
@@ -362,7 +433,7 @@ if __name__ == "__main__":
         print(f"Chunking: {test_doc.filename}")
         
         splitter = SemanticTextSplitter()
-        chunks = splitter.chunk_document(test_doc)
+        chunks = splitter.chunk_document_list(test_doc)
         
         print(f"\n✅ Created {len(chunks)} chunks")
         print(f"Avg chunk size: {sum(c.word_count for c in chunks) // len(chunks)} words")
@@ -2,15 +2,75 @@
 Groq LLM Client
 Uses Groq API with Llama 3.1 8B (100% free)
 """
-from typing import List, Dict, Optional
-import time
-from groq import Groq
+from typing import AsyncIterator, List, Dict, Optional
+import asyncio
+from groq import (
+    APIConnectionError,
+    AsyncGroq,
+    Groq,
+    InternalServerError,
+    RateLimitError,
+)
+from tenacity import (
+    RetryCallState,
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_random_exponential,
+)
 
 from ..core.config import settings
 from ..core.logger import setup_logger, log_extra
 
 logger = setup_logger(__name__)
 
+# Retry policy for Groq calls (the SDK's own retries are disabled so there is
+# a single layer): up to 4 attempts on 429s and transient server/network
+# errors, waiting a jittered exponential backoff unless Groq says how long
+MAX_ATTEMPTS = 4
+MAX_RETRY_AFTER = 30.0  # seconds; longer Retry-After values are capped
+_backoff = wait_random_exponential(min=0.5, max=8)
+
+
+def _retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Retry-After header of a Groq error response, in seconds"""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers["retry-after"])
+    except (KeyError, ValueError):
+        return None
+
+
+def _wait(retry_state: RetryCallState) -> float:
+    """Honor Retry-After when present, else jittered exponential backoff"""
+    retry_after = _retry_after_seconds(retry_state.outcome.exception())
+    if retry_after is not None:
+        return min(retry_after, MAX_RETRY_AFTER)
+    return _backoff(retry_state)
+
+
+def _log_retry(retry_state: RetryCallState):
+    """Log each retry with the error type and the wait before the next attempt"""
+    logger.warning(
+        "Groq request failed, retrying",
+        extra=log_extra(
+            attempt=retry_state.attempt_number,
+            error=type(retry_state.outcome.exception()).__name__,
+            wait=round(retry_state.next_action.sleep, 2)
+        )
+    )
+
+
+_with_retries = retry(
+    retry=retry_if_exception_type((RateLimitError, APIConnectionError, InternalServerError)),
+    wait=_wait,
+    stop=stop_after_attempt(MAX_ATTEMPTS),
+    before_sleep=_log_retry,
+    reraise=True,
+)
+
 
 class GroqClient:
     """
@@ -23,7 +83,8 @@ class GroqClient:
         if not settings.GROQ_API_KEY:
             raise ValueError("GROQ_API_KEY not found in environment")
         
-        self.client = Groq(api_key=settings.GROQ_API_KEY)
+        self.client = Groq(api_key=settings.GROQ_API_KEY, max_retries=0)
+        self.async_client = AsyncGroq(api_key=settings.GROQ_API_KEY, max_retries=0)
         self.model = settings.LLM_MODEL
         self.temperature = settings.LLM_TEMPERATURE
         self.max_tokens = settings.LLM_MAX_TOKENS
@@ -46,12 +107,12 @@ class GroqClient:
             messages: List of message dicts with 'role' and 'content'
             temperature: Override default temperature
             max_tokens: Override default max tokens
-            
+        
         Returns:
             Generated response text
         """
         try:
-            response = self.client.chat.completions.create(
+            response = self._create(
                 model=self.model,
                 messages=messages,
                 temperature=temperature or self.temperature,
@@ -71,25 +132,150 @@ class GroqClient:
             return content
         
         except Exception as e:
-            error_msg = str(e)
+            logger.error(
+                f"Chat completion failed: {str(e)}",
+                exc_info=True
+            )
+            return self._fallback_response()
+    
+    async def achat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None
+    ) -> str:
+        """
+        Async variant of chat_completion() using AsyncGroq
+        
+        Waiting on the API (and on retry backoff) never blocks the
+        event loop, so concurrent requests overlap their round-trips.
+        
+        Args:
+            messages: List of message dicts with 'role' and 'content'
+            temperature: Override default temperature
+            max_tokens: Override default max tokens
+        
+        Returns:
+            Generated response text
+        """
+        try:
+            response = await self._acreate(
+                model=self.model,
+                messages=messages,
+                temperature=temperature or self.temperature,
+                max_tokens=max_tokens or self.max_tokens,
+            )
             
-            # Handle rate limiting
-            if "rate_limit" in error_msg.lower() or "429" in error_msg:
-                logger.warning("Rate limit hit, waiting 2 seconds...")
-                time.sleep(2)
-                # Retry once
-                try:
-                    return self.chat_completion(messages, temperature, max_tokens)
-                except Exception as retry_error:
-                    logger.error(f"Retry failed: {str(retry_error)}")
-                    return self._fallback_response()
+            content = response.choices[0].message.content
+            
+            logger.info(
+                "Chat completion generated",
+                extra=log_extra(
+                    tokens_used=response.usage.total_tokens,
+                    response_length=len(content)
+                )
+            )
             
+            return content
+        
+        except Exception as e:
             logger.error(
-                f"Chat completion failed: {error_msg}",
+                f"Chat completion failed: {str(e)}",
                 exc_info=True
             )
             return self._fallback_response()
     
+    async def achat_completions_batch(
+        self,
+        messages_list: List[List[Dict[str, str]]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None
+    ) -> List[str]:
+        """
+        Run several chat completions concurrently (e.g. multi-hop sub-queries)
+        
+        Args:
+            messages_list: One message list per completion
+            temperature: Override default temperature
+            max_tokens: Override default max tokens
+        
+        Returns:
+            Response texts in the same order (failures get the fallback text)
+        """
+        return list(await asyncio.gather(*(
+            self.achat_completion(messages, temperature, max_tokens)
+            for messages in messages_list
+        )))
+    
+    async def stream_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream chat completion tokens as they are generated
+        
+        Args:
+            messages: List of message dicts with 'role' and 'content'
+            temperature: Override default temperature
+            max_tokens: Override default max tokens
+        
+        Yields:
+            Text deltas (the fallback message if the request fails up front)
+        
+        Raises:
+            Exception: If the stream fails after tokens were yielded, so
+                       callers can tell a cut-off answer from a complete one
+        """
+        response_length = 0
+        
+        try:
+            stream = await self._acreate(
+                model=self.model,
+                messages=messages,
+                temperature=temperature or self.temperature,
+                max_tokens=max_tokens or self.max_tokens,
+                stream=True,
+            )
+            
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    response_length += len(delta)
+                    yield delta
+        
+        except Exception as e:
+            logger.error(
+                f"Streaming chat completion failed: {str(e)}",
+                extra=log_extra(response_length=response_length),
+                exc_info=True
+            )
+            # Only substitute the fallback if nothing reached the client yet
+            if response_length:
+                raise
+            yield self._fallback_response()
+            return
+        
+        logger.info(
+            "Streaming chat completion finished",
+            extra=log_extra(response_length=response_length)
+        )
+    
+    @_with_retries
+    def _create(self, **kwargs):
+        """chat.completions.create with retries"""
+        return self.client.chat.completions.create(**kwargs)
+    
+    @_with_retries
+    async def _acreate(self, **kwargs):
+        """Async chat.completions.create with retries"""
+        return await self.async_client.chat.completions.create(**kwargs)
+    
+    async def aclose(self):
+        """Close the async HTTP client's connection pool"""
+        await self.async_client.close()
+    
     def _fallback_response(self) -> str:
         """Return fallback response when LLM fails"""
         return (
@@ -6,7 +6,9 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
+from .api.v1.deps import ainit_components
 from .api.v1.router import router as api_v1_router
+from .api.v1.responses import NumpyORJSONResponse
 from .core.config import settings
 from .core.logger import setup_logger
 
@@ -19,16 +21,30 @@ async def lifespan(app: FastAPI):
     """Application lifespan events"""
     # Startup
     logger.info("Starting Budget 2026 AI Backend...")
-    logger.info("⚠ Running with lazy loading to fit in 512MB RAM")
-    logger.info("Models will load on first request (~10-15s delay)")
     
-    # Skip pre-loading to save memory on Render free tier
-    # Models will load on first API call instead
+    if settings.PRELOAD_MODELS:
+        # Load and warm up the embedding model before accepting traffic.
+        # Components are shared through app.state, so only one copy is loaded;
+        # independent ones load in parallel.
+        await ainit_components(app)
+        logger.info("✓ Models loaded and warmed up")
+    else:
+        logger.info("⚠ Running with lazy loading to fit in 512MB RAM")
+        logger.info("Models will load on first request (~10-15s delay)")
     
     yield
     
     # Shutdown
     logger.info("Shutting down Budget 2026 AI Backend...")
+    batcher = getattr(app.state, "embed_batcher", None)
+    if batcher is not None:
+        await batcher.close()
+    rag = getattr(app.state, "rag", None)
+    if rag is not None:
+        await rag.llm.aclose()
+    vector_store = getattr(app.state, "vector_store", None)
+    if vector_store is not None:
+        await vector_store.aclose()
 
 
 # Create FastAPI app
@@ -36,7 +52,8 @@ app = FastAPI(
     title="Budget 2026 AI API",
     description="AI-powered Budget 2026 explainer with RAG",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=NumpyORJSONResponse
 )
 
 # CORS configuration
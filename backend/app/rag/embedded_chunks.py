@@ -0,0 +1,81 @@
+"""
+Embedded chunk files: chunk fields as JSON, vectors in a binary .npy sidecar
+"""
+from pathlib import Path
+from typing import Dict, List, Optional
+import numpy as np
+import orjson
+
+from ..core.config import settings
+
+
+def save_embedded_chunks(
+    embedded_file: str,
+    chunks: List[Dict],
+    metadata: Optional[Dict] = None,
+    dtype: Optional[str] = None
+):
+    """
+    Save embedded chunks as JSON plus a binary vector sidecar
+    
+    Vectors go to <stem>.emb.npy; the JSON (written with orjson) keeps a
+    row reference per chunk instead of hundreds of floats as text.
+    
+    Args:
+        embedded_file: Path to the embedded chunks JSON file
+        chunks: Chunks with an 'embedding' field
+        metadata: Stored alongside the chunks
+        dtype: Sidecar dtype, float16 (half the size, negligible retrieval
+               loss) or float32 (default from settings)
+    """
+    vectors = np.asarray(
+        [chunk['embedding'] for chunk in chunks],
+        dtype=dtype or settings.EMBEDDING_STORE_DTYPE
+    )
+    np.save(_embeddings_path(embedded_file), vectors)
+    
+    output_data = {
+        'metadata': metadata or {},
+        'chunks': [
+            {**{k: v for k, v in chunk.items() if k != 'embedding'}, 'embedding_ref': i}
+            for i, chunk in enumerate(chunks)
+        ]
+    }
+    Path(embedded_file).write_bytes(orjson.dumps(output_data, option=orjson.OPT_INDENT_2))
+
+
+def load_embedded_chunks(embedded_file: str) -> List[Dict]:
+    """
+    Load chunks saved by save_embedded_chunks()
+    
+    The sidecar is memory-mapped, so each chunk's 'embedding' is a view
+    that is only read from disk when used (e.g. during upload). Files from
+    before the sidecar, with vectors inline in the JSON, load as well.
+    
+    Args:
+        embedded_file: Path to the embedded chunks JSON file
+    
+    Returns:
+        Chunks with 'embedding' restored (in the sidecar dtype)
+    
+    Raises:
+        FileNotFoundError: If the JSON refers to a missing sidecar
+    """
+    chunks = orjson.loads(Path(embedded_file).read_bytes())['chunks']
+    
+    if chunks and 'embedding_ref' not in chunks[0]:
+        for chunk in chunks:
+            chunk['embedding'] = np.asarray(chunk['embedding'], dtype=np.float32)
+        return chunks
+    
+    vectors = np.asarray(np.load(_embeddings_path(embedded_file), mmap_mode='r'))
+    for chunk in chunks:
+        chunk['embedding'] = vectors[chunk.pop('embedding_ref')]
+    
+    return chunks
+
+
+def _embeddings_path(embedded_file: str) -> Path:
+    """Sidecar .emb.npy path next to an embedded chunks JSON file"""
+    path = Path(embedded_file)
+    return path.with_name(f"{path.stem}.emb.npy")
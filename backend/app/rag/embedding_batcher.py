@@ -0,0 +1,154 @@
+"""
+Micro-batching for query embeddings
+Collates concurrent embedding requests into a single encode() call
+"""
+from typing import List, Optional, Tuple
+import asyncio
+import numpy as np
+from collections import OrderedDict
+from functools import partial
+
+from .embeddings_local import LocalEmbeddingGenerator
+from ..core.config import settings
+from ..core.logger import setup_logger, log_extra
+
+logger = setup_logger(__name__)
+
+
+class EmbeddingBatcher:
+    """
+    Queue in front of LocalEmbeddingGenerator
+    
+    Requests arriving within a short window (max_wait_ms) are encoded
+    together, up to max_batch_size texts per forward pass. Encoding runs
+    in the default executor so the event loop stays responsive.
+    Recent vectors are kept in an LRU cache so repeated queries skip
+    the model entirely.
+    """
+    
+    def __init__(
+        self,
+        embedder: LocalEmbeddingGenerator,
+        max_batch_size: int = None,
+        max_wait_ms: int = None,
+        cache_size: int = None
+    ):
+        """
+        Initialize embedding batcher
+        
+        Args:
+            embedder: Embedding generator used for encoding
+            max_batch_size: Max texts per encode() call (default from settings)
+            max_wait_ms: Max time to wait for a batch to fill (default from settings)
+            cache_size: Max cached query vectors (default from settings, 0 disables)
+        """
+        self.embedder = embedder
+        self.max_batch_size = max_batch_size or settings.EMBED_BATCH_MAX_SIZE
+        self.max_wait = (max_wait_ms or settings.EMBED_BATCH_MAX_WAIT_MS) / 1000
+        self.cache_size = settings.EMBED_CACHE_SIZE if cache_size is None else cache_size
+        
+        self._cache: "OrderedDict[str, Tuple[float, ...]]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        
+        logger.info(
+            "Initialized EmbeddingBatcher",
+            extra=log_extra(
+                max_batch_size=self.max_batch_size,
+                max_wait_ms=self.max_wait * 1000,
+                cache_size=self.cache_size
+            )
+        )
+    
+    async def submit(self, text: str) -> np.ndarray:
+        """
+        Queue a text for embedding and wait for its vector
+        
+        Args:
+            text: Text to embed
+        
+        Returns:
+            float32 embedding vector (read-only, shared with the cache)
+        """
+        if not text or not text.strip():
+            return self.embedder.generate_embedding(text)
+        
+        cached = self._cache.get(text)
+        if cached is not None:
+            self._cache.move_to_end(text)
+            return cached
+        
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+    
+    async def _collect_batch(self) -> List[Tuple[str, asyncio.Future]]:
+        """Wait for one request, then gather more until full or the window closes"""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        
+        return batch
+    
+    async def _run(self):
+        """Background task: drain the queue batch by batch"""
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            batch = await self._collect_batch()
+            texts = [text for text, _ in batch]
+            
+            try:
+                embeddings = await loop.run_in_executor(
+                    None,
+                    partial(self.embedder.encode, texts, batch_size=len(texts))
+                )
+            except Exception as e:
+                logger.error(
+                    f"Batched embedding failed: {str(e)}",
+                    extra=log_extra(batch_size=len(texts)),
+                    exc_info=True
+                )
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            
+            for (text, future), vector in zip(batch, embeddings):
+                vector.flags.writeable = False
+                self._remember(text, vector)
+                if not future.done():
+                    future.set_result(vector)
+    
+    def _remember(self, text: str, vector: np.ndarray):
+        """Store a vector in the LRU cache, evicting the oldest entry"""
+        if self.cache_size <= 0:
+            return
+        
+        self._cache[text] = vector
+        self._cache.move_to_end(text)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+    
+    async def close(self):
+        """Stop the background worker"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
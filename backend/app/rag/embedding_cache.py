@@ -0,0 +1,133 @@
+"""
+Persistent embedding cache for Budget 2026 AI Platform
+Content-addressed SQLite store so re-runs only embed new or changed text
+"""
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence
+import hashlib
+import sqlite3
+import numpy as np
+
+from ..core.config import settings
+from ..core.logger import setup_logger, log_extra
+
+logger = setup_logger(__name__)
+
+# SQLite caps bound parameters per statement (999 on older builds)
+_MAX_PARAMS = 900
+
+
+class EmbeddingCache:
+    """
+    On-disk cache of embedding vectors
+    
+    Keys are sha256(model + "\\0" + text), so the same text embedded by a
+    different model never collides. Vectors are stored as raw float32 bytes.
+    """
+    
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Open (or create) the cache database
+        
+        Args:
+            path: SQLite file (default from settings)
+        """
+        self.path = Path(path or settings.EMBEDDING_CACHE_PATH)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key BLOB PRIMARY KEY, vector BLOB NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._conn.commit()
+    
+    @staticmethod
+    def key(model: str, text: str) -> bytes:
+        """Cache key for a (model, text) pair"""
+        return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).digest()
+    
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        """Cached vector for a key, or None"""
+        return self.get_many([key])[0]
+    
+    def get_many(self, keys: Sequence[bytes]) -> List[Optional[np.ndarray]]:
+        """Cached vectors for keys (None where missing), in key order"""
+        found = {}
+        
+        for start in range(0, len(keys), _MAX_PARAMS):
+            batch = keys[start:start + _MAX_PARAMS]
+            rows = self._conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})",
+                batch
+            )
+            for key, vector in rows:
+                found[key] = np.frombuffer(vector, dtype=np.float32)
+        
+        return [found.get(key) for key in keys]
+    
+    def put_many(self, keys: Sequence[bytes], vectors: Sequence):
+        """Store vectors under keys (replacing existing entries)"""
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+            (
+                (key, np.asarray(vector, dtype=np.float32).tobytes())
+                for key, vector in zip(keys, vectors)
+            )
+        )
+        self._conn.commit()
+    
+    def embed(
+        self,
+        texts: List[str],
+        model: str,
+        embed_fn: Callable[[List[str]], Sequence[np.ndarray]]
+    ) -> List[np.ndarray]:
+        """
+        Embed texts, calling embed_fn only for the ones not cached yet
+        
+        Args:
+            texts: Texts to embed
+            model: Model identifier (part of the cache key)
+            embed_fn: Embeds a list of texts (e.g. generate_embeddings_batch)
+        
+        Returns:
+            List of float32 embedding vectors in input order
+        """
+        keys = [self.key(model, text) for text in texts]
+        embeddings = self.get_many(keys)
+        missing = [i for i, vector in enumerate(embeddings) if vector is None]
+        
+        if missing:
+            new_embeddings = embed_fn([texts[i] for i in missing])
+            for i, embedding in zip(missing, new_embeddings):
+                embeddings[i] = embedding
+            
+            # Zero vectors are failed calls - don't make them permanent
+            stored = [(keys[i], e) for i, e in zip(missing, new_embeddings) if any(e)]
+            if stored:
+                self.put_many([key for key, _ in stored], [e for _, e in stored])
+        
+        logger.info(
+            "Embedding cache lookup",
+            extra=log_extra(
+                total=len(texts),
+                hits=len(texts) - len(missing),
+                misses=len(missing)
+            )
+        )
+        
+        return embeddings
+    
+    def close(self):
+        """Close the database connection"""
+        self._conn.close()
+    
+    def __enter__(self) -> "EmbeddingCache":
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
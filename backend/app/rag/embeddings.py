@@ -2,15 +2,118 @@
 Embedding generation for Budget 2026 AI Platform
 Uses OpenAI API (lightweight, no local models needed)
 """
+from pathlib import Path
 from typing import List, Dict, Optional
+import asyncio
+import base64
 import time
-from openai import OpenAI
+import numpy as np
+import orjson
+from openai import (
+    APIConnectionError,
+    AsyncOpenAI,
+    InternalServerError,
+    OpenAI,
+    RateLimitError,
+)
+from tenacity import (
+    RetryCallState,
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential_jitter,
+)
 
+from .embedded_chunks import save_embedded_chunks
+from .embedding_cache import EmbeddingCache
 from ..core.config import settings
 from ..core.logger import setup_logger, log_extra
 
 logger = setup_logger(__name__)
 
+# Batch API limits: embedding inputs per job (summed over all request
+# lines), and terminal job states
+BATCH_API_MAX_INPUTS = 50_000
+_BATCH_DONE_STATES = ("completed", "failed", "expired", "cancelled")
+
+# Retry policy for embedding calls (the SDK's own retries are disabled):
+# up to 6 attempts on 429s, timeouts and transient server/network errors,
+# honoring Retry-After when OpenAI sends it. A batch that still fails
+# raises - a zero vector would silently match every query.
+MAX_ATTEMPTS = 6
+MAX_RETRY_AFTER = 60.0  # seconds; longer Retry-After values are capped
+_backoff = wait_exponential_jitter(initial=1, max=32)
+
+
+def _retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Retry-After header of an OpenAI error response, in seconds"""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers["retry-after"])
+    except (KeyError, ValueError):
+        return None
+
+
+def _wait(retry_state: RetryCallState) -> float:
+    """Honor Retry-After when present, else jittered exponential backoff"""
+    retry_after = _retry_after_seconds(retry_state.outcome.exception())
+    if retry_after is not None:
+        return min(retry_after, MAX_RETRY_AFTER)
+    return _backoff(retry_state)
+
+
+def _log_retry(retry_state: RetryCallState):
+    """Log each retry with the error type and the wait before the next attempt"""
+    logger.warning(
+        "OpenAI embedding request failed, retrying",
+        extra=log_extra(
+            attempt=retry_state.attempt_number,
+            error=type(retry_state.outcome.exception()).__name__,
+            wait=round(retry_state.next_action.sleep, 2)
+        )
+    )
+
+
+# APITimeoutError is a subclass of APIConnectionError
+_with_retries = retry(
+    retry=retry_if_exception_type((RateLimitError, APIConnectionError, InternalServerError)),
+    wait=_wait,
+    stop=stop_after_attempt(MAX_ATTEMPTS),
+    before_sleep=_log_retry,
+    reraise=True,
+)
+
+
+def _decode(data) -> List[np.ndarray]:
+    """float32 vectors from an embeddings response requested as base64"""
+    return [np.frombuffer(base64.b64decode(item.embedding), dtype=np.float32) for item in data]
+
+
+class _RequestPacer:
+    """
+    Spaces request starts at least 60/rpm seconds apart
+    
+    Keeps a concurrent run under the account's requests-per-minute quota
+    up front instead of discovering it through 429s and backoff.
+    """
+    
+    def __init__(self, rpm: int):
+        self.interval = 60.0 / rpm if rpm > 0 else 0.0
+        self._next_slot = 0.0
+    
+    async def wait(self):
+        """Wait for this request's start slot"""
+        if not self.interval:
+            return
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self._next_slot)
+        # Claimed before awaiting - the event loop is single-threaded
+        self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
 
 class EmbeddingGenerator:
     """
@@ -34,118 +137,290 @@ class EmbeddingGenerator:
         if not settings.OPENAI_API_KEY:
             raise ValueError("OPENAI_API_KEY not found in environment")
         
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        self.client = OpenAI(api_key=settings.OPENAI_API_KEY, max_retries=0)
+        self.async_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, max_retries=0)
         
         logger.info(
             f"Initialized EmbeddingGenerator",
             extra=log_extra(model=model, dimension=self.dimension)
         )
     
-    def generate_embedding(self, text: str) -> List[float]:
+    def generate_embedding(self, text: str) -> np.ndarray:
         """
         Generate embedding for a single text
         
         Args:
             text: Text to embed
-            
+        
         Returns:
-            List of floats (embedding vector)
+            float32 embedding vector
+        
+        Raises:
+            openai.OpenAIError: If the request still fails after retries
         """
         if not text or not text.strip():
             logger.warning("Empty text provided for embedding")
-            return [0.0] * self.dimension
+            return np.zeros(self.dimension, dtype=np.float32)
         
         try:
-            response = self.client.embeddings.create(
+            response = self._create(
                 model=self.model,
-                input=text[:8000]  # OpenAI limit is 8191 tokens
+                input=text[:8000],  # OpenAI limit is 8191 tokens
+                encoding_format="base64"
             )
-            
-            return response.data[0].embedding
-        
         except Exception as e:
             logger.error(
                 f"Failed to generate embedding: {str(e)}",
                 extra=log_extra(text_length=len(text)),
                 exc_info=True
             )
-            # Return zero vector on error
-            return [0.0] * self.dimension
+            raise
+        
+        return _decode(response.data)[0]
     
     def generate_embeddings_batch(
         self,
         texts: List[str],
         batch_size: int = 100,
-        delay: float = 0.1
-    ) -> List[List[float]]:
+        max_concurrency: Optional[int] = None
+    ) -> List[np.ndarray]:
         """
         Generate embeddings for multiple texts with batching
         
+        Blocking wrapper around agenerate_embeddings_batch() for scripts;
+        call that directly from async code.
+        
         Args:
             texts: List of texts to embed
             batch_size: Number of texts per batch (max 2048 for OpenAI)
-            delay: Delay between batches (rate limiting)
-            
+            max_concurrency: Max batches in flight (default from settings)
+        
         Returns:
-            List of embedding vectors
+            List of float32 embedding vectors
+        """
+        async def run() -> List[np.ndarray]:
+            # asyncio.run() closes its loop on return, and an async client's
+            # connection pool is bound to the loop it first ran on - so each
+            # run gets (and closes) its own client
+            async with AsyncOpenAI(api_key=settings.OPENAI_API_KEY, max_retries=0) as client:
+                return await self.agenerate_embeddings_batch(
+                    texts,
+                    batch_size=batch_size,
+                    max_concurrency=max_concurrency,
+                    client=client
+                )
+        
+        return asyncio.run(run())
+    
+    async def agenerate_embeddings_batch(
+        self,
+        texts: List[str],
+        batch_size: int = 100,
+        max_concurrency: Optional[int] = None,
+        client: Optional[AsyncOpenAI] = None
+    ) -> List[np.ndarray]:
+        """
+        Generate embeddings for multiple texts, several batches at a time
+        
+        Requests are latency-bound, so up to max_concurrency batches are
+        sent concurrently instead of one after another. Duplicate texts
+        (repeated headers, tables of contents) are embedded once. Results
+        keep the input order.
+        
+        Args:
+            texts: List of texts to embed
+            batch_size: Number of texts per batch (max 2048 for OpenAI)
+            max_concurrency: Max batches in flight (default from settings)
+            client: Async client to send requests with (default: the
+                    generator's own, bound to the caller's event loop)
+        
+        Returns:
+            List of float32 embedding vectors
+        
+        Raises:
+            openai.OpenAIError: If any batch still fails after retries
+                                (the other batches are allowed to finish)
         """
         logger.info(
             f"Generating embeddings for {len(texts)} texts",
             extra=log_extra(batch_size=batch_size, total=len(texts))
         )
         
-        embeddings = []
+        # Embed each distinct text once, in first-seen order
+        unique = list(dict.fromkeys(texts))
         
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
-            batch_num = i // batch_size + 1
-            total_batches = (len(texts) + batch_size - 1) // batch_size
-            
-            logger.info(
-                f"Processing batch {batch_num}/{total_batches}",
-                extra=log_extra(batch_size=len(batch))
-            )
-            
-            try:
-                # Clean texts (remove empty ones)
-                clean_batch = [t[:8000] if t else " " for t in batch]
-                
-                response = self.client.embeddings.create(
-                    model=self.model,
-                    input=clean_batch
+        semaphore = asyncio.Semaphore(max_concurrency or settings.EMBED_API_CONCURRENCY)
+        pacer = _RequestPacer(settings.EMBED_API_RPM)
+        starts = range(0, len(unique), batch_size)
+        total_batches = len(starts)
+        
+        async def embed_batch(start: int) -> List[np.ndarray]:
+            async with semaphore:
+                logger.debug(
+                    f"Processing batch {start // batch_size + 1}/{total_batches}",
+                    extra=log_extra(batch_size=len(unique[start:start + batch_size]))
                 )
-                
-                # Extract embeddings in order
-                batch_embeddings = [item.embedding for item in response.data]
-                embeddings.extend(batch_embeddings)
-                
-                # Rate limiting
-                if delay > 0 and i + batch_size < len(texts):
-                    time.sleep(delay)
-            
-            except Exception as e:
+                await pacer.wait()
+                return await self._aembed_batch(unique[start:start + batch_size], client)
+        
+        results = await asyncio.gather(
+            *(embed_batch(start) for start in starts),
+            return_exceptions=True
+        )
+        
+        embeddings = []
+        error = None
+        
+        for start, result in zip(starts, results):
+            if isinstance(result, BaseException):
                 logger.error(
-                    f"Batch {batch_num} failed: {str(e)}",
-                    extra=log_extra(batch_start=i, batch_end=i+len(batch)),
-                    exc_info=True
+                    f"Batch {start // batch_size + 1} failed: {str(result)}",
+                    extra=log_extra(batch_start=start, batch_end=min(start + batch_size, len(unique))),
+                    exc_info=result
                 )
-                # Add zero vectors for failed batch
-                embeddings.extend([[0.0] * self.dimension] * len(batch))
+                error = error or result
+            else:
+                embeddings.extend(result)
+        
+        if error is not None:
+            raise error
+        
+        # Scatter back to the input positions
+        if len(unique) < len(texts):
+            by_text = dict(zip(unique, embeddings))
+            embeddings = [by_text[text] for text in texts]
         
         logger.info(
             f"Generated {len(embeddings)} embeddings",
             extra=log_extra(
-                success_rate=sum(1 for e in embeddings if sum(e) != 0) / len(embeddings) * 100
+                # any() stops at the first non-zero value of each vector
+                success_rate=sum(map(any, embeddings)) / len(embeddings) * 100 if embeddings else 0
             )
         )
         
         return embeddings
     
+    async def _aembed_batch(
+        self,
+        batch: List[str],
+        client: Optional[AsyncOpenAI] = None
+    ) -> List[np.ndarray]:
+        """Embed one batch with the async client (embeddings in input order)"""
+        # Clean texts (remove empty ones)
+        clean_batch = [t[:8000] if t else " " for t in batch]
+        
+        # base64 is decoded straight into float32 arrays - no per-float
+        # Python objects (the SDK's default decoding ends in .tolist())
+        response = await self._acreate(
+            client or self.async_client,
+            model=self.model,
+            input=clean_batch,
+            encoding_format="base64"
+        )
+        
+        return _decode(response.data)
+    
+    @_with_retries
+    def _create(self, **kwargs):
+        """embeddings.create with retries on rate limits and transient errors"""
+        return self.client.embeddings.create(**kwargs)
+    
+    @_with_retries
+    async def _acreate(self, client: AsyncOpenAI, **kwargs):
+        """Async embeddings.create with the same retry policy"""
+        return await client.embeddings.create(**kwargs)
+    
+    def generate_embeddings_via_batch_api(
+        self,
+        texts: List[str],
+        batch_size: int = 100,
+        poll_interval: float = 30.0
+    ) -> List[np.ndarray]:
+        """
+        Generate embeddings through the OpenAI Batch API
+        
+        Half the price of synchronous calls and a separate rate-limit pool,
+        but results can take up to 24 hours - meant for offline ingestion.
+        Each request line embeds batch_size texts; jobs are split so none
+        carries more than BATCH_API_MAX_INPUTS texts in total, submitted
+        together and then polled.
+        
+        Args:
+            texts: List of texts to embed
+            batch_size: Number of texts per request line
+            poll_interval: Seconds between job status checks
+        
+        Returns:
+            List of float32 embedding vectors
+        
+        Raises:
+            RuntimeError: If a job does not complete or a request failed
+        """
+        starts = range(0, len(texts), batch_size)
+        # Every line holds at most batch_size inputs
+        lines_per_job = max(1, BATCH_API_MAX_INPUTS // batch_size)
+        jobs = []
+        
+        for job_start in range(0, len(starts), lines_per_job):
+            lines = b"".join(
+                orjson.dumps({
+                    "custom_id": str(start),
+                    "method": "POST",
+                    "url": "/v1/embeddings",
+                    "body": {
+                        "model": self.model,
+                        "input": [t[:8000] if t else " " for t in texts[start:start + batch_size]]
+                    }
+                }) + b"\n"
+                for start in starts[job_start:job_start + lines_per_job]
+            )
+            input_file = self.client.files.create(file=("embeddings.jsonl", lines), purpose="batch")
+            jobs.append(self.client.batches.create(
+                input_file_id=input_file.id,
+                endpoint="/v1/embeddings",
+                completion_window="24h"
+            ))
+        
+        logger.info(
+            f"Submitted {len(jobs)} Batch API job(s) for {len(texts)} texts",
+            extra=log_extra(batch_ids=[job.id for job in jobs])
+        )
+        
+        embeddings: List[Optional[np.ndarray]] = [None] * len(texts)
+        
+        for job in jobs:
+            while job.status not in _BATCH_DONE_STATES:
+                time.sleep(poll_interval)
+                job = self.client.batches.retrieve(job.id)
+            
+            if job.status != "completed" or not job.output_file_id:
+                raise RuntimeError(f"Batch API job {job.id} ended with status {job.status}")
+            
+            output = self.client.files.content(job.output_file_id).text
+            for line in output.splitlines():
+                item = orjson.loads(line)
+                response = item.get("response") or {}
+                if response.get("status_code") != 200:
+                    continue
+                start = int(item["custom_id"])
+                # Results carry their position in the line's input list
+                for data in response["body"]["data"]:
+                    embeddings[start + data["index"]] = np.asarray(data["embedding"], dtype=np.float32)
+        
+        missing = sum(1 for e in embeddings if e is None)
+        if missing:
+            raise RuntimeError(f"Batch API returned no embedding for {missing} texts")
+        
+        logger.info(f"Generated {len(embeddings)} embeddings via Batch API")
+        
+        return embeddings
+    
     def embed_chunks(
         self,
         chunks: List[Dict],
         text_field: str = 'text',
-        batch_size: int = 100
+        batch_size: int = 100,
+        use_batch_api: bool = False
     ) -> List[Dict]:
         """
         Add embeddings to chunk dictionaries
@@ -154,7 +429,8 @@ class EmbeddingGenerator:
             chunks: List of chunk dictionaries
             text_field: Field name containing text to embed
             batch_size: Batch size for API calls
-            
+            use_batch_api: Embed through the (cheaper, slower) Batch API
+        
         Returns:
             Chunks with 'embedding' field added
         """
@@ -166,8 +442,18 @@ class EmbeddingGenerator:
         # Extract texts
         texts = [chunk.get(text_field, '') for chunk in chunks]
         
-        # Generate embeddings
-        embeddings = self.generate_embeddings_batch(texts, batch_size=batch_size)
+        embed = self.generate_embeddings_via_batch_api if use_batch_api else self.generate_embeddings_batch
+        
+        # Generate embeddings (only for text not already in the cache)
+        if settings.EMBEDDING_CACHE_ENABLED:
+            with EmbeddingCache() as cache:
+                embeddings = cache.embed(
+                    texts,
+                    self.model,
+                    lambda batch: embed(batch, batch_size=batch_size)
+                )
+        else:
+            embeddings = embed(texts, batch_size=batch_size)
         
         # Add to chunks
         for chunk, embedding in zip(chunks, embeddings):
@@ -187,7 +473,8 @@ class EmbeddingGenerator:
 def generate_embeddings_for_file(
     input_file: str,
     output_file: str = None,
-    batch_size: int = 100
+    batch_size: int = 100,
+    use_batch_api: bool = False
 ) -> List[Dict]:
     """
     Load chunks from file, generate embeddings, and save
@@ -196,18 +483,15 @@ def generate_embeddings_for_file(
         input_file: Path to chunks JSON file
         output_file: Path to save embedded chunks (optional)
         batch_size: Batch size for API calls
-        
+        use_batch_api: Embed through the Batch API (50% cheaper, up to 24h)
+    
     Returns:
         Chunks with embeddings
     """
-    import json
-    from pathlib import Path
-    
     logger.info(f"Loading chunks from {input_file}")
     
     # Load chunks
-    with open(input_file, 'r') as f:
-        data = json.load(f)
+    data = orjson.loads(Path(input_file).read_bytes())
     
     if isinstance(data, dict) and 'chunks' in data:
         chunks = data['chunks']
@@ -218,19 +502,19 @@ def generate_embeddings_for_file(
     
     # Generate embeddings
     generator = EmbeddingGenerator()
-    embedded_chunks = generator.embed_chunks(chunks, batch_size=batch_size)
+    embedded_chunks = generator.embed_chunks(
+        chunks,
+        batch_size=batch_size,
+        use_batch_api=use_batch_api
+    )
     
     # Save if output specified
     if output_file:
-        logger.info(f"Saving embedded chunks to {output_file}")
-        
-        output_data = {
-            'metadata': data.get('metadata', {}) if isinstance(data, dict) else {},
-            'chunks': embedded_chunks
-        }
-        
-        with open(output_file, 'w') as f:
-            json.dump(output_data, f, indent=2)
+        save_embedded_chunks(
+            output_file,
+            embedded_chunks,
+            metadata=data.get('metadata', {}) if isinstance(data, dict) else {}
+        )
     
     return embedded_chunks
 
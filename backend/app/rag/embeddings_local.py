@@ -1,16 +1,129 @@
 """
 Local embedding generation using sentence-transformers
-100% free, no API needed
+100% free, no API needed (optional ONNX int8 runtime for faster CPU inference)
 """
-from typing import List, Dict
+from pathlib import Path
+from typing import List, Dict, Optional, Tuple, Union
+import asyncio
+import threading
 import time
+import numpy as np
+import torch
 from sentence_transformers import SentenceTransformer
 
+from .embedding_cache import EmbeddingCache
 from ..core.config import settings
 from ..core.logger import setup_logger, log_extra
 
 logger = setup_logger(__name__)
 
+# ONNX Runtime execution providers in order of preference; the first one
+# this onnxruntime build has is used (CPU is always available)
+ONNX_PROVIDERS = ("OpenVINOExecutionProvider", "DnnlExecutionProvider", "CPUExecutionProvider")
+
+# Encoder processes for multi_process encoding (each runs its own torch
+# thread pool, sized by OMP_NUM_THREADS in its environment)
+MULTI_PROCESS_WORKERS = 4
+
+
+class OnnxSentenceEncoder:
+    """
+    Drop-in replacement for SentenceTransformer.encode backed by an
+    int8-quantized ONNX export (see scripts/export_onnx_int8.py)
+    
+    Reproduces the all-MiniLM pipeline: mean pooling + L2 normalization
+    """
+    
+    def __init__(
+        self,
+        model_dir: Path,
+        num_threads: int = 0,
+        max_length: int = 256,
+        providers: Tuple[str, ...] = ONNX_PROVIDERS
+    ):
+        """
+        Load quantized model and tokenizer
+        
+        Args:
+            model_dir: Directory produced by the export script
+            num_threads: ONNX Runtime intra-op threads (0 = runtime default)
+            max_length: Max tokens per text (MiniLM was trained with 256)
+            providers: Execution providers in order of preference
+        
+        Raises:
+            FileNotFoundError: If the export is missing
+            ImportError: If onnxruntime / optimum are not installed
+        """
+        if not (Path(model_dir) / "model_quantized.onnx").exists():
+            raise FileNotFoundError(
+                f"No model_quantized.onnx in {model_dir} - run scripts/export_onnx_int8.py"
+            )
+        
+        import onnxruntime as ort
+        from optimum.onnxruntime import ORTModelForFeatureExtraction
+        from transformers import AutoTokenizer
+        
+        session_options = ort.SessionOptions()
+        session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            session_options.intra_op_num_threads = num_threads
+        
+        available = ort.get_available_providers()
+        self.provider = next((p for p in providers if p in available), "CPUExecutionProvider")
+        
+        self.max_length = max_length
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(
+            model_dir,
+            file_name="model_quantized.onnx",
+            provider=self.provider,
+            session_options=session_options
+        )
+        logger.info(
+            "Loaded ONNX model",
+            extra=log_extra(provider=self.provider, available_providers=available)
+        )
+    
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        batch_size: int = 32,
+        show_progress_bar: bool = False,
+        convert_to_numpy: bool = True
+    ) -> np.ndarray:
+        """Encode text(s); a single string returns a 1-D vector"""
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        
+        # Batch texts of similar length together (as SentenceTransformer
+        # does) so each batch pads to a short maximum; undone below
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+        sorted_texts = [texts[i] for i in order]
+        
+        batches = []
+        for start in range(0, len(sorted_texts), batch_size):
+            inputs = self.tokenizer(
+                sorted_texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_length,
+                return_tensors="np"
+            )
+            hidden = self.model(**inputs).last_hidden_state
+            
+            # Mean pooling over real tokens, then L2 normalize
+            mask = inputs["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+            pooled /= np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+            batches.append(pooled.astype(np.float32))
+        
+        if not batches:
+            return np.empty((0, 0), dtype=np.float32)
+        
+        embeddings = np.empty((len(texts), batches[0].shape[1]), dtype=np.float32)
+        embeddings[order] = np.concatenate(batches)
+        return embeddings[0] if single else embeddings
+
 
 class LocalEmbeddingGenerator:
     """
@@ -18,7 +131,12 @@ class LocalEmbeddingGenerator:
     Free, runs on CPU, no API costs
     """
     
-    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
+    def __init__(
+        self,
+        model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+        backend: Optional[str] = None,
+        providers: Tuple[str, ...] = ONNX_PROVIDERS
+    ):
         """
         Initialize local embedding generator
         
@@ -26,19 +144,104 @@ class LocalEmbeddingGenerator:
             model_name: HuggingFace model name
                        - all-MiniLM-L6-v2 (384 dim, fastest, recommended)
                        - all-mpnet-base-v2 (768 dim, more accurate, slower)
+            backend: "torch" or "onnx" (default from settings); onnx falls
+                     back to torch when the runtime or export is missing
+            providers: ONNX Runtime execution providers in order of
+                       preference (onnx backend only)
         """
         self.model_name = model_name
         self.dimension = 384 if "MiniLM" in model_name else 768
         
+        self.backend = backend or settings.EMBEDDING_BACKEND
+        
         logger.info(f"Loading model: {model_name}")
-        self.model = SentenceTransformer(model_name)
+        self.model = None
+        if self.backend == "onnx":
+            try:
+                self.model = OnnxSentenceEncoder(
+                    settings.EMBEDDING_ONNX_DIR,
+                    num_threads=settings.EMBED_THREADS,
+                    providers=providers
+                )
+            except (ImportError, OSError) as e:
+                logger.warning(
+                    f"ONNX backend unavailable, falling back to torch: {str(e)}",
+                    extra=log_extra(onnx_dir=str(settings.EMBEDDING_ONNX_DIR))
+                )
+                # The cache key includes the backend, so record what really runs
+                self.backend = "torch"
+        
+        if self.model is None:
+            if settings.EMBED_THREADS:
+                torch.set_num_threads(settings.EMBED_THREADS)
+            self.model = SentenceTransformer(model_name)
         
         logger.info(
             "Initialized LocalEmbeddingGenerator",
-            extra=log_extra(model=model_name, dimension=self.dimension)
+            extra=log_extra(model=model_name, dimension=self.dimension, backend=self.backend)
+        )
+    
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """
+        Encode texts straight to an embedding matrix
+        
+        No logging or zero-vector fallback - intended for hot paths
+        (request micro-batching, warmup) that handle errors themselves
+        
+        Args:
+            texts: List of texts to embed
+            batch_size: Number of texts per forward pass
+            
+        Returns:
+            Array of shape (len(texts), dimension)
+        """
+        return self.model.encode(
+            texts,
+            batch_size=batch_size,
+            show_progress_bar=False,
+            convert_to_numpy=True
         )
     
-    def generate_embedding(self, text: str) -> List[float]:
+    def tune_batch_size(
+        self,
+        texts: List[str],
+        candidates: Tuple[int, ...] = (16, 32, 64, 128)
+    ) -> int:
+        """
+        Pick the fastest encode batch size for this machine and corpus
+        
+        The best size depends on core count and text length, so each
+        candidate encodes the same sample (the first 2 * max(candidates)
+        texts) and the one with the lowest time wins.
+        
+        Args:
+            texts: Texts that are about to be embedded
+            candidates: Batch sizes to try
+            
+        Returns:
+            Fastest batch size
+        """
+        sample = texts[:2 * max(candidates)]
+        self.encode(sample[:min(candidates)], batch_size=min(candidates))  # warmup
+        
+        timings = {}
+        for batch_size in candidates:
+            start = time.perf_counter()
+            self.encode(sample, batch_size=batch_size)
+            timings[batch_size] = time.perf_counter() - start
+        
+        best = min(timings, key=timings.get)
+        logger.info(
+            "Tuned embedding batch size",
+            extra=log_extra(
+                batch_size=best,
+                sample=len(sample),
+                timings_ms={str(bs): round(t * 1000, 1) for bs, t in timings.items()}
+            )
+        )
+        return best
+    
+    def generate_embedding(self, text: str) -> np.ndarray:
         """
         Generate embedding for a single text
         
@@ -46,15 +249,14 @@ class LocalEmbeddingGenerator:
             text: Text to embed
             
         Returns:
-            List of floats (embedding vector)
+            float32 embedding vector
         """
         if not text or not text.strip():
             logger.warning("Empty text provided for embedding")
-            return [0.0] * self.dimension
+            return np.zeros(self.dimension, dtype=np.float32)
         
         try:
-            embedding = self.model.encode(text, show_progress_bar=False)
-            return embedding.tolist()
+            return self.model.encode(text, show_progress_bar=False)
         
         except Exception as e:
             logger.error(
@@ -62,29 +264,65 @@ class LocalEmbeddingGenerator:
                 extra=log_extra(text_length=len(text)),
                 exc_info=True
             )
-            return [0.0] * self.dimension
+            return np.zeros(self.dimension, dtype=np.float32)
+    
+    async def aget_embedding(self, text: str) -> np.ndarray:
+        """
+        Async variant of generate_embedding()
+        
+        The encode runs in a worker thread, so the event loop keeps
+        serving other requests meanwhile.
+        """
+        return await asyncio.to_thread(self.generate_embedding, text)
+    
+    async def aget_embeddings(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """Async variant of encode(), run in a worker thread"""
+        return await asyncio.to_thread(self.encode, texts, batch_size)
     
     def generate_embeddings_batch(
         self,
         texts: List[str],
-        batch_size: int = 32
-    ) -> List[List[float]]:
+        batch_size: int = 32,
+        multi_process: bool = False
+    ) -> np.ndarray:
         """
         Generate embeddings for multiple texts
         
         Args:
             texts: List of texts to embed
             batch_size: Number of texts per batch
+            multi_process: Shard the texts across MULTI_PROCESS_WORKERS
+                           encoder processes (torch backend only); each
+                           loads its own model copy, so only worth it for
+                           large inputs on many-core machines
             
         Returns:
-            List of embedding vectors
+            float32 matrix, one row per text
         """
+        if multi_process and self.backend != "torch":
+            logger.warning(
+                "multi_process encoding needs the torch backend - encoding in-process",
+                extra=log_extra(backend=self.backend)
+            )
+            multi_process = False
         logger.info(
             f"Generating embeddings for {len(texts)} texts",
-            extra=log_extra(batch_size=batch_size, total=len(texts))
+            extra=log_extra(batch_size=batch_size, total=len(texts), multi_process=multi_process)
         )
         
         try:
+            if multi_process:
+                pool = self.model.start_multi_process_pool(["cpu"] * MULTI_PROCESS_WORKERS)
+                try:
+                    return self.model.encode_multi_process(
+                        texts,
+                        pool,
+                        batch_size=batch_size,
+                        chunk_size=1024
+                    )
+                finally:
+                    self.model.stop_multi_process_pool(pool)
+            
             embeddings = self.model.encode(
                 texts,
                 batch_size=batch_size,
@@ -92,20 +330,21 @@ class LocalEmbeddingGenerator:
                 convert_to_numpy=True
             )
             
-            return embeddings.tolist()
+            return embeddings
         
         except Exception as e:
             logger.error(
                 f"Batch embedding failed: {str(e)}",
                 exc_info=True
             )
-            return [[0.0] * self.dimension] * len(texts)
+            return np.zeros((len(texts), self.dimension), dtype=np.float32)
     
     def embed_chunks(
         self,
         chunks: List[Dict],
         text_field: str = 'text',
-        batch_size: int = 32
+        batch_size: int = 32,
+        multi_process: bool = False
     ) -> List[Dict]:
         """
         Add embeddings to chunk dictionaries
@@ -114,6 +353,8 @@ class LocalEmbeddingGenerator:
             chunks: List of chunk dictionaries
             text_field: Field name containing text to embed
             batch_size: Batch size for encoding
+            multi_process: Encode across several processes (see
+                           generate_embeddings_batch)
             
         Returns:
             Chunks with 'embedding' field added
@@ -126,8 +367,24 @@ class LocalEmbeddingGenerator:
         # Extract texts
         texts = [chunk.get(text_field, '') for chunk in chunks]
         
-        # Generate embeddings
-        embeddings = self.generate_embeddings_batch(texts, batch_size=batch_size)
+        # Generate embeddings (only for text not already in the cache)
+        if settings.EMBEDDING_CACHE_ENABLED:
+            with EmbeddingCache() as cache:
+                embeddings = cache.embed(
+                    texts,
+                    f"{self.model_name}:{self.backend}",
+                    lambda batch: self.generate_embeddings_batch(
+                        batch,
+                        batch_size=batch_size,
+                        multi_process=multi_process
+                    )
+                )
+        else:
+            embeddings = self.generate_embeddings_batch(
+                texts,
+                batch_size=batch_size,
+                multi_process=multi_process
+            )
         
         # Add to chunks
         for chunk, embedding in zip(chunks, embeddings):
@@ -143,6 +400,25 @@ class LocalEmbeddingGenerator:
         return chunks
 
 
+# Singleton instance
+_generator = None
+_generator_lock = threading.Lock()
+
+def get_embedding_generator() -> LocalEmbeddingGenerator:
+    """
+    Get singleton LocalEmbeddingGenerator (the model loads once per process)
+    
+    Callers may race from worker threads (startup preload, health check);
+    the lock makes sure only one of them loads the model.
+    """
+    global _generator
+    if _generator is None:
+        with _generator_lock:
+            if _generator is None:
+                _generator = LocalEmbeddingGenerator()
+    return _generator
+
+
 if __name__ == "__main__":
     # Test embedding generator
     print("🔮 Testing Local Embedding Generator\n")
@@ -2,9 +2,11 @@
 Complete RAG Pipeline
 Retrieves relevant chunks and generates responses using Groq LLM
 """
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import asyncio
 
-from .embeddings_local import LocalEmbeddingGenerator
+from .embeddings_local import LocalEmbeddingGenerator, get_embedding_generator
+from .embedding_batcher import EmbeddingBatcher
 from .vector_store import SupabaseVectorStore
 from ..llm.groq_client import get_groq_client
 from ..llm.prompts import (
@@ -27,23 +29,35 @@ class RAGPipeline:
         self,
         top_k: int = 8,  # Retrieve more candidates
         similarity_threshold: float = 0.3,
-        max_context_chunks: int = 5  # Use top 5 in prompt (was 3)
+        max_context_chunks: int = 5,  # Use top 5 in prompt (was 3)
+        embedder: Optional[LocalEmbeddingGenerator] = None,
+        vector_store: Optional[SupabaseVectorStore] = None,
+        embed_batcher: Optional[EmbeddingBatcher] = None
     ):
         """
         Initialize RAG pipeline
         
         Args:
-            top_k: Number of chunks to retrieve
+            top_k: Upper bound on chunks to retrieve
             similarity_threshold: Minimum similarity score
             max_context_chunks: Max chunks to use in context
+            embedder: Shared embedding model (created if not given)
+            vector_store: Shared vector store (created if not given)
+            embed_batcher: Shared micro-batcher; async retrieval goes through
+                           it so repeated questions reuse cached query vectors
         """
         self.top_k = top_k
         self.similarity_threshold = similarity_threshold
         self.max_context_chunks = max_context_chunks
         
+        # Nothing re-ranks the candidates, and match_budget_chunks already
+        # returns them nearest-first - only fetch the rows the prompt uses
+        self.retrieve_k = min(top_k, max_context_chunks)
+        
         # Initialize components
-        self.embedder = LocalEmbeddingGenerator()
-        self.vector_store = SupabaseVectorStore()
+        self.embedder = embedder or get_embedding_generator()
+        self.vector_store = vector_store or SupabaseVectorStore()
+        self.embed_batcher = embed_batcher
         self.llm = get_groq_client()
         
         logger.info(
@@ -101,7 +115,7 @@ class RAGPipeline:
             filters: Optional metadata filters (or auto-detected)
             
         Returns:
-            List of relevant chunks with similarity scores
+            List of relevant chunks with similarity scores, most similar first
         """
         logger.info(f"Retrieving context for query: {query[:100]}...")
         
@@ -117,11 +131,62 @@ class RAGPipeline:
         # Search vector store
         results = self.vector_store.similarity_search(
             query_embedding=query_embedding,
-            k=self.top_k,
+            k=self.retrieve_k,
+            threshold=self.similarity_threshold,
+            filters=filters
+        )
+        
+        self._log_retrieval(results)
+        
+        return results
+    
+    async def aretrieve(
+        self,
+        query: str,
+        filters: Optional[Dict] = None
+    ) -> List[Dict]:
+        """
+        Async variant of retrieve()
+        
+        Query embedding runs in a worker thread while metadata filters are
+        extracted; the vector store lookup is awaited on the shared async
+        PostgREST session, so the event loop is never blocked.
+        
+        Args:
+            query: User's question
+            filters: Optional metadata filters (or auto-detected)
+            
+        Returns:
+            List of relevant chunks with similarity scores, most similar first
+        """
+        logger.info(f"Retrieving context for query: {query[:100]}...")
+        
+        # Start embedding first; filter extraction overlaps with it
+        if self.embed_batcher is not None:
+            embedding_task = asyncio.create_task(self.embed_batcher.submit(query))
+        else:
+            embedding_task = asyncio.create_task(self.embedder.aget_embedding(query))
+        
+        if filters is None:
+            filters = self._extract_metadata_filters(query)
+            if filters:
+                logger.info(f"Auto-detected filters: {filters}")
+        
+        query_embedding = await embedding_task
+        
+        results = await self.vector_store.asimilarity_search(
+            query_embedding=query_embedding,
+            k=self.retrieve_k,
             threshold=self.similarity_threshold,
             filters=filters
         )
         
+        self._log_retrieval(results)
+        
+        return results
+    
+    def _log_retrieval(self, results: List[Dict]):
+        """Log retrieval statistics"""
         logger.info(
             f"Retrieved {len(results)} chunks",
             extra=log_extra(
@@ -129,8 +194,6 @@ class RAGPipeline:
                 avg_similarity=sum(r['similarity'] for r in results) / len(results) if results else 0
             )
         )
-        
-        return results
     
     def generate(
         self,
@@ -147,12 +210,50 @@ class RAGPipeline:
         Returns:
             Response dict with answer and sources
         """
-        # Select top chunks for context (by similarity)
-        top_chunks = sorted(
-            context_chunks,
-            key=lambda x: x['similarity'],
-            reverse=True
-        )[:self.max_context_chunks]
+        top_chunks, messages = self._build_messages(query, context_chunks)
+        
+        response_text = self.llm.chat_completion(messages)
+        
+        # Format response with sources
+        return format_response_with_sources(response_text, top_chunks)
+    
+    async def agenerate(
+        self,
+        query: str,
+        context_chunks: List[Dict]
+    ) -> Dict:
+        """
+        Async variant of generate()
+        
+        The LLM call goes through the async Groq client.
+        
+        Args:
+            query: User's question
+            context_chunks: Retrieved chunks
+            
+        Returns:
+            Response dict with answer and sources
+        """
+        top_chunks, messages = self._build_messages(query, context_chunks)
+        
+        response_text = await self.llm.achat_completion(messages)
+        
+        # Format response with sources
+        return format_response_with_sources(response_text, top_chunks)
+    
+    def _build_messages(
+        self,
+        query: str,
+        context_chunks: List[Dict]
+    ) -> tuple:
+        """
+        Select context chunks and build LLM messages
+        
+        Returns:
+            (top_chunks, messages)
+        """
+        # Retrieved chunks arrive ordered by similarity (the RPC sorts them)
+        top_chunks = context_chunks[:self.max_context_chunks]
         
         # Create prompt
         if top_chunks:
@@ -161,16 +262,12 @@ class RAGPipeline:
             user_prompt = create_no_context_prompt(query)
             logger.warning("No context found for query")
         
-        # Generate response
         messages = [
             {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "user", "content": user_prompt}
         ]
         
-        response_text = self.llm.chat_completion(messages)
-        
-        # Format response with sources
-        return format_response_with_sources(response_text, top_chunks)
+        return top_chunks, messages
     
     def query(
         self,
@@ -198,6 +295,78 @@ class RAGPipeline:
         # Step 2: Generate
         response = self.generate(question, chunks)
         
+        self._log_completion(response)
+        
+        return response
+    
+    async def aquery(
+        self,
+        question: str,
+        user_metadata: Optional[Dict] = None
+    ) -> Dict:
+        """
+        Async RAG query: retrieve + generate without blocking the event loop
+        
+        Args:
+            question: User's question
+            user_metadata: Optional user metadata for filtering
+            
+        Returns:
+            Response dict with answer and sources
+        """
+        logger.info(
+            f"Processing RAG query",
+            extra=log_extra(query=question[:100])
+        )
+        
+        # Step 1: Retrieve
+        chunks = await self.aretrieve(question, filters=user_metadata)
+        
+        # Step 2: Generate
+        response = await self.agenerate(question, chunks)
+        
+        self._log_completion(response)
+        
+        return response
+    
+    async def stream_query(
+        self,
+        question: str,
+        user_metadata: Optional[Dict] = None
+    ) -> AsyncIterator[Tuple[str, Optional[List[Dict]]]]:
+        """
+        Streaming RAG query: retrieve, then yield the answer as it is generated
+        
+        Args:
+            question: User's question
+            user_metadata: Optional user metadata for filtering
+            
+        Yields:
+            (delta_text, None) for each answer token, then ("", sources) once
+        """
+        logger.info(
+            f"Processing streaming RAG query",
+            extra=log_extra(query=question[:100])
+        )
+        
+        chunks = await self.aretrieve(question, filters=user_metadata)
+        top_chunks, messages = self._build_messages(question, chunks)
+        
+        answer_length = 0
+        async for delta in self.llm.stream_chat_completion(messages):
+            answer_length += len(delta)
+            yield delta, None
+        
+        sources = format_response_with_sources("", top_chunks)['sources']
+        logger.info(
+            "RAG query completed",
+            extra=log_extra(num_sources=len(sources), answer_length=answer_length)
+        )
+        
+        yield "", sources
+    
+    def _log_completion(self, response: Dict):
+        """Log final RAG response statistics"""
         logger.info(
             "RAG query completed",
             extra=log_extra(
@@ -205,16 +374,22 @@ class RAGPipeline:
                 answer_length=len(response['answer'])
             )
         )
-        
-        return response
 
 
 # Singleton instance
 _rag_pipeline = None
 
-def get_rag_pipeline() -> RAGPipeline:
+def get_rag_pipeline(
+    embedder: Optional[LocalEmbeddingGenerator] = None,
+    vector_store: Optional[SupabaseVectorStore] = None,
+    embed_batcher: Optional[EmbeddingBatcher] = None
+) -> RAGPipeline:
     """Get singleton RAG pipeline instance"""
     global _rag_pipeline
     if _rag_pipeline is None:
-        _rag_pipeline = RAGPipeline()
+        _rag_pipeline = RAGPipeline(
+            embedder=embedder,
+            vector_store=vector_store,
+            embed_batcher=embed_batcher
+        )
     return _rag_pipeline
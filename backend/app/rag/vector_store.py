@@ -2,8 +2,15 @@
 Supabase vector store integration for Budget 2026 AI Platform
 Uses pgvector for semantic similarity search
 """
-from typing import List, Dict, Optional, Tuple
+from typing import Iterable, List, Dict, Optional, Set, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
 import json
+import time
+import httpx
+import numpy as np
+import orjson
+from postgrest.exceptions import APIError
 from supabase import create_client, Client
 
 from ..core.config import settings
@@ -11,6 +18,26 @@ from ..core.logger import setup_logger, log_extra
 
 logger = setup_logger(__name__)
 
+# Columns written by the bulk upload path (COPY into a temp table, then upsert)
+_UPLOAD_COLUMNS = (
+    'chunk_id', 'document_name', 'page_number', 'chunk_index', 'text',
+    'word_count', 'quality_score', 'content_hash', 'embedding', 'embedding_model',
+    'metadata', 'pipeline_version'
+)
+
+# content_hash values per PostgREST IN (...) filter (keeps the URL short)
+_HASH_LOOKUP_BATCH = 200
+
+# Postgres / PostgREST error codes for a column the table does not have
+_MISSING_COLUMN_CODES = ('42703', 'PGRST204')
+
+_CONTENT_HASH_MIGRATION = "ALTER TABLE {table} ADD COLUMN IF NOT EXISTS content_hash TEXT;"
+
+
+def content_hash(text: str) -> str:
+    """Stable hash of a chunk's text, stored with the row to detect unchanged chunks"""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
 
 class SupabaseVectorStore:
     """
@@ -42,6 +69,27 @@ class SupabaseVectorStore:
         # Initialize client (no proxy parameter in v2.3.4)
         self.client: Client = create_client(self.supabase_url, self.supabase_key)
         
+        # Async PostgREST session for the request path: same endpoint and
+        # auth as the sync client, one keep-alive HTTP/2 pool shared by all
+        # concurrent requests
+        session = self.client.postgrest.session
+        self.async_session = httpx.AsyncClient(
+            base_url=session.base_url,
+            headers=session.headers,
+            timeout=session.timeout,
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=32)
+        )
+        
+        # (count, expires_at) for get_chunk_count
+        self._chunk_count_cache: Optional[Tuple[int, float]] = None
+        
+        # Direct Postgres connection for bulk uploads (opened on first use)
+        self._pg = None
+        
+        # Whether the table has content_hash (see _has_content_hash)
+        self._content_hash_column: Optional[bool] = None
+        
         logger.info(
             f"Initialized SupabaseVectorStore",
             extra=log_extra(table=table_name)
@@ -66,9 +114,10 @@ class SupabaseVectorStore:
           text TEXT NOT NULL,
           word_count INTEGER,
           quality_score FLOAT,
+          content_hash TEXT,  -- see content_hash(); skips unchanged chunks on re-runs
           
-          -- Embedding
-          embedding vector(1536),
+          -- Embedding (halfvec: 2 bytes per dimension, pgvector 0.7+)
+          embedding halfvec(1536),
           embedding_model TEXT,
           
           -- Metadata (JSONB for flexible querying)
@@ -83,12 +132,13 @@ class SupabaseVectorStore:
         -- Create indexes
         CREATE INDEX IF NOT EXISTS idx_document_name ON budget_chunks(document_name);
         CREATE INDEX IF NOT EXISTS idx_quality_score ON budget_chunks(quality_score);
+        CREATE INDEX IF NOT EXISTS idx_content_hash ON budget_chunks(content_hash);
         CREATE INDEX IF NOT EXISTS idx_metadata_gin ON budget_chunks USING GIN(metadata);
         
-        -- Vector similarity index (IVFFlat for fast approximate search)
-        CREATE INDEX IF NOT EXISTS idx_embedding_vector 
-        ON budget_chunks USING ivfflat (embedding vector_cosine_ops)
-        WITH (lists = 100);
+        -- Vector similarity index (HNSW for fast approximate search)
+        CREATE INDEX IF NOT EXISTS idx_embedding_hnsw
+        ON budget_chunks USING hnsw (embedding halfvec_cosine_ops)
+        WITH (m = 16, ef_construction = 64);
         
         -- Function for similarity search
         CREATE OR REPLACE FUNCTION match_budget_chunks(
@@ -106,7 +156,10 @@ class SupabaseVectorStore:
           similarity float
         )
         LANGUAGE plpgsql
+        SET hnsw.ef_search = 40
         AS $$
+        DECLARE
+          query_vec halfvec(1536) := query_embedding::halfvec(1536);
         BEGIN
           RETURN QUERY
           SELECT
@@ -115,12 +168,12 @@ class SupabaseVectorStore:
             budget_chunks.page_number,
             budget_chunks.text,
             budget_chunks.metadata,
-            1 - (budget_chunks.embedding <=> query_embedding) as similarity
+            1 - (budget_chunks.embedding <=> query_vec) as similarity
           FROM budget_chunks
           WHERE 
             (filter_metadata = '{}'::jsonb OR budget_chunks.metadata @> filter_metadata)
-            AND 1 - (budget_chunks.embedding <=> query_embedding) > match_threshold
-          ORDER BY budget_chunks.embedding <=> query_embedding
+            AND 1 - (budget_chunks.embedding <=> query_vec) > match_threshold
+          ORDER BY budget_chunks.embedding <=> query_vec
           LIMIT match_count;
         END;
         $$;
@@ -139,6 +192,8 @@ class SupabaseVectorStore:
             Success boolean
         """
         try:
+            self._has_content_hash()
+            
             # Prepare data
             data = {
                 'chunk_id': chunk['chunk_id'],
@@ -148,6 +203,7 @@ class SupabaseVectorStore:
                 'text': chunk['text'],
                 'word_count': chunk['word_count'],
                 'quality_score': chunk.get('quality_score', 1.0),
+                'content_hash': chunk.get('content_hash') or content_hash(chunk['text']),
                 'embedding': chunk['embedding'],
                 'embedding_model': chunk.get('embedding_model', 'unknown'),
                 'metadata': chunk.get('metadata', {}),
@@ -155,7 +211,7 @@ class SupabaseVectorStore:
             }
             
             # Insert (upsert to handle duplicates)
-            self.client.table(self.table_name).upsert(data).execute()
+            self._upsert_rows([data])
             
             return True
         
@@ -169,14 +225,20 @@ class SupabaseVectorStore:
     def upload_chunks_batch(
         self,
         chunks: List[Dict],
-        batch_size: int = 100
+        batch_size: int = 100,
+        max_workers: Optional[int] = None
     ) -> Dict[str, int]:
         """
         Upload multiple chunks in batches
         
+        Upload time is dominated by round trips, so PostgREST batches are
+        sent from several threads at once. A psycopg connection runs one
+        transaction at a time, so COPY batches stay sequential.
+        
         Args:
             chunks: List of chunk dictionaries with embeddings
             batch_size: Number of chunks per batch
+            max_workers: Batches in flight (default from settings)
             
         Returns:
             Statistics dictionary
@@ -186,15 +248,22 @@ class SupabaseVectorStore:
             extra=log_extra(batch_size=batch_size)
         )
         
-        success_count = 0
-        failed_count = 0
+        starts = range(0, len(chunks), batch_size)
+        total_batches = len(starts)
+        
+        if settings.SUPABASE_DB_URL:
+            max_workers = 1
+        elif max_workers is None:
+            max_workers = settings.UPLOAD_CONCURRENCY
         
-        for i in range(0, len(chunks), batch_size):
+        # Checked once up front rather than by every upload thread
+        self._has_content_hash()
+        
+        def upload(i: int) -> bool:
             batch = chunks[i:i + batch_size]
             batch_num = i // batch_size + 1
-            total_batches = (len(chunks) + batch_size - 1) // batch_size
             
-            logger.info(
+            logger.debug(
                 f"Uploading batch {batch_num}/{total_batches}",
                 extra=log_extra(size=len(batch))
             )
@@ -211,6 +280,7 @@ class SupabaseVectorStore:
                         'text': chunk['text'],
                         'word_count': chunk['word_count'],
                         'quality_score': chunk.get('quality_score', 1.0),
+                        'content_hash': chunk.get('content_hash') or content_hash(chunk['text']),
                         'embedding': chunk['embedding'],
                         'embedding_model': chunk.get('embedding_model', 'unknown'),
                         'metadata': chunk.get('metadata', {}),
@@ -218,8 +288,8 @@ class SupabaseVectorStore:
                     })
                 
                 # Batch upsert
-                self.client.table(self.table_name).upsert(batch_data).execute()
-                success_count += len(batch)
+                self._upsert_rows(batch_data)
+                return True
             
             except Exception as e:
                 logger.error(
@@ -227,7 +297,23 @@ class SupabaseVectorStore:
                     extra=log_extra(batch_start=i, batch_end=i+len(batch)),
                     exc_info=True
                 )
-                failed_count += len(batch)
+                return False
+        
+        if max_workers > 1 and total_batches > 1:
+            with ThreadPoolExecutor(max_workers=min(max_workers, total_batches)) as executor:
+                results = list(executor.map(upload, starts))
+        else:
+            results = [upload(i) for i in starts]
+        
+        success_count = 0
+        failed_count = 0
+        
+        for i, ok in zip(starts, results):
+            size = len(chunks[i:i + batch_size])
+            if ok:
+                success_count += size
+            else:
+                failed_count += size
         
         stats = {
             'total': len(chunks),
@@ -242,9 +328,165 @@ class SupabaseVectorStore:
         
         return stats
     
+    def embed_and_upload(
+        self,
+        chunks: List[Dict],
+        generator,
+        batch_size: int = 100,
+        embed_batch_size: Optional[int] = None
+    ) -> Dict[str, int]:
+        """
+        Embed and upload chunks as a two-stage pipeline
+        
+        While one batch is being uploaded, the next one is embedded in a
+        worker thread, so total time approaches max(embed, upload) rather
+        than their sum. At most one embedded batch waits in memory.
+        
+        Args:
+            chunks: List of chunk dictionaries (without embeddings)
+            generator: Embedding generator with embed_chunks() (local or OpenAI)
+            batch_size: Number of chunks per embed/upload step
+            embed_batch_size: Texts per model forward pass / API call
+                              (generator default if not given)
+            
+        Returns:
+            Statistics dictionary (as upload_chunks_batch)
+        """
+        stats = {'total': len(chunks), 'success': 0, 'failed': 0}
+        starts = range(0, len(chunks), batch_size)
+        embed_kwargs = {'batch_size': embed_batch_size} if embed_batch_size else {}
+        
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            def embed(start: int):
+                return executor.submit(
+                    generator.embed_chunks,
+                    chunks[start:start + batch_size],
+                    **embed_kwargs
+                )
+            
+            pending = embed(starts[0]) if starts else None
+            
+            for n, start in enumerate(starts):
+                embedded = pending.result()
+                if n + 1 < len(starts):
+                    pending = embed(starts[n + 1])
+                
+                batch_stats = self.upload_chunks_batch(embedded, batch_size=batch_size)
+                stats['success'] += batch_stats['success']
+                stats['failed'] += batch_stats['failed']
+        
+        logger.info(
+            "Embed and upload completed",
+            extra=log_extra(**stats)
+        )
+        
+        return stats
+    
+    def _upsert_rows(self, rows: List[Dict]):
+        """
+        Upsert rows, via COPY when SUPABASE_DB_URL is set
+        
+        PostgREST upserts ship every vector as a JSON array and parse it
+        server-side; COPY streams rows over the Postgres protocol instead.
+        """
+        upload_columns = _UPLOAD_COLUMNS
+        if not self._has_content_hash():
+            upload_columns = tuple(col for col in _UPLOAD_COLUMNS if col != 'content_hash')
+            for row in rows:
+                row.pop('content_hash', None)
+        
+        if not settings.SUPABASE_DB_URL:
+            # PostgREST needs plain JSON: vectors loaded from disk are arrays
+            for row in rows:
+                if isinstance(row['embedding'], np.ndarray):
+                    row['embedding'] = row['embedding'].tolist()
+            self.client.table(self.table_name).upsert(rows).execute()
+            return
+        
+        columns = ', '.join(upload_columns)
+        updates = ', '.join(f"{col} = EXCLUDED.{col}" for col in upload_columns[1:])
+        
+        conn = self._pg_connection()
+        with conn.transaction(), conn.cursor() as cur:
+            cur.execute(
+                f"CREATE TEMP TABLE _upload (LIKE {self.table_name} INCLUDING DEFAULTS) ON COMMIT DROP"
+            )
+            with cur.copy(f"COPY _upload ({columns}) FROM STDIN") as copy:
+                for row in rows:
+                    copy.write_row([
+                        # pgvector and jsonb both accept JSON text
+                        orjson.dumps(row[col], option=orjson.OPT_SERIALIZE_NUMPY).decode()
+                        if col in ('embedding', 'metadata') else row[col]
+                        for col in upload_columns
+                    ])
+            cur.execute(
+                f"INSERT INTO {self.table_name} ({columns}) "
+                f"SELECT {columns} FROM _upload "
+                f"ON CONFLICT (chunk_id) DO UPDATE SET {updates}, updated_at = NOW()"
+            )
+    
+    def _has_content_hash(self) -> bool:
+        """
+        Whether the table has the content_hash column (checked once)
+        
+        Tables created before the column existed keep accepting uploads,
+        just without hashes, until the migration is run.
+        """
+        if self._content_hash_column is None:
+            try:
+                self.client.table(self.table_name).select('content_hash').limit(1).execute()
+                self._content_hash_column = True
+            except APIError as e:
+                if e.code not in _MISSING_COLUMN_CODES:
+                    # Not a schema problem - leave it to the upload to report
+                    return True
+                self._content_hash_column = False
+                logger.warning(
+                    f"Table {self.table_name} has no content_hash column - uploading without "
+                    f"hashes, so incremental uploads re-send every chunk. To fix, run: "
+                    + _CONTENT_HASH_MIGRATION.format(table=self.table_name),
+                    extra=log_extra(table=self.table_name)
+                )
+        return self._content_hash_column
+    
+    def _pg_connection(self):
+        """Direct Postgres connection for bulk uploads (psycopg, lazy)"""
+        if self._pg is None or self._pg.closed:
+            import psycopg
+            
+            self._pg = psycopg.connect(settings.SUPABASE_DB_URL)
+        return self._pg
+    
+    def _rpc(self, func: str, params: Dict):
+        """
+        Call a Postgres function through PostgREST
+        
+        Goes straight to the PostgREST session (HTTP/2, keep-alive) so both
+        directions use orjson: the query vector is encoded without the stdlib
+        float repr loop, and the result rows are parsed in a single pass with
+        no pydantic APIResponse wrapping.
+        """
+        response = self.client.postgrest.session.post(
+            f"/rpc/{func}",
+            content=orjson.dumps(params, option=orjson.OPT_SERIALIZE_NUMPY),
+            headers={"Content-Type": "application/json"}
+        )
+        response.raise_for_status()
+        return orjson.loads(response.content)
+    
+    async def _arpc(self, func: str, params: Dict):
+        """Async variant of _rpc() on the shared async session"""
+        response = await self.async_session.post(
+            f"/rpc/{func}",
+            content=orjson.dumps(params, option=orjson.OPT_SERIALIZE_NUMPY),
+            headers={"Content-Type": "application/json"}
+        )
+        response.raise_for_status()
+        return orjson.loads(response.content)
+    
     def similarity_search(
         self,
-        query_embedding: List[float],
+        query_embedding: np.ndarray,
         k: int = 5,
         threshold: float = 0.5,
         filters: Dict = None
@@ -265,7 +507,7 @@ class SupabaseVectorStore:
             # Call the match function
             filter_metadata = filters or {}
             
-            result = self.client.rpc(
+            return self._rpc(
                 'match_budget_chunks',
                 {
                     'query_embedding': query_embedding,
@@ -273,9 +515,7 @@ class SupabaseVectorStore:
                     'match_count': k,
                     'filter_metadata': filter_metadata
                 }
-            ).execute()
-            
-            return result.data
+            )
         
         except Exception as e:
             logger.error(
@@ -285,10 +525,84 @@ class SupabaseVectorStore:
             )
             return []
     
-    def get_chunk_count(self) -> int:
-        """Get total number of chunks in database"""
+    async def asimilarity_search(
+        self,
+        query_embedding: np.ndarray,
+        k: int = 5,
+        threshold: float = 0.5,
+        filters: Dict = None
+    ) -> List[Dict]:
+        """
+        Async variant of similarity_search() - no worker thread, the RPC
+        is awaited on the event loop
+        """
+        try:
+            return await self._arpc(
+                'match_budget_chunks',
+                {
+                    'query_embedding': query_embedding,
+                    'match_threshold': threshold,
+                    'match_count': k,
+                    'filter_metadata': filters or {}
+                }
+            )
+        
+        except Exception as e:
+            logger.error(
+                f"Similarity search failed: {str(e)}",
+                extra=log_extra(k=k, threshold=threshold),
+                exc_info=True
+            )
+            return []
+    
+    async def aclose(self):
+        """Close the async HTTP session's connection pool"""
+        await self.async_session.aclose()
+    
+    def get_existing_hashes(self, hashes: Iterable[str]) -> Set[str]:
+        """
+        Which of the given content hashes are already stored
+        
+        Args:
+            hashes: content_hash() values of the chunks about to be uploaded
+            
+        Returns:
+            The subset present in the table (empty if the table has no
+            content_hash column yet)
+        """
+        hashes = list(dict.fromkeys(hashes))
+        existing = set()
+        
+        if not self._has_content_hash():
+            return existing
+        
+        for start in range(0, len(hashes), _HASH_LOOKUP_BATCH):
+            result = (
+                self.client.table(self.table_name)
+                .select('content_hash')
+                .in_('content_hash', hashes[start:start + _HASH_LOOKUP_BATCH])
+                .execute()
+            )
+            existing.update(row['content_hash'] for row in result.data)
+        
+        return existing
+    
+    def get_chunk_count(self, max_age: float = 30.0) -> int:
+        """
+        Get total number of chunks in database
+        
+        Args:
+            max_age: Seconds a previously fetched count may be reused
+                     (the count only changes on ingestion; 0 forces a query)
+        """
+        now = time.monotonic()
+        if self._chunk_count_cache is not None and self._chunk_count_cache[1] > now:
+            return self._chunk_count_cache[0]
+        
         try:
             result = self.client.table(self.table_name).select('id', count='exact').execute()
+            # Only successful lookups are cached
+            self._chunk_count_cache = (result.count, now + max_age)
             return result.count
         except Exception as e:
             logger.error(f"Failed to get chunk count: {str(e)}")
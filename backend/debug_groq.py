@@ -1,11 +1,20 @@
-from groq import Groq
-import os
-
-print("Testing Groq import...")
-try:
-    client = Groq(api_key="gsk_test")
-    print("✅ Groq client initialized successfully")
-except Exception as e:
-    print(f"❌ Groq init failed: {e}")
-    import traceback
-    traceback.print_exc()
+import sys
+
+
+def main() -> bool:
+    from groq import Groq
+
+    print("Testing Groq import...")
+    try:
+        Groq(api_key="gsk_test")
+        print("✅ Groq client initialized successfully")
+        return True
+    except Exception as e:
+        print(f"❌ Groq init failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -16,13 +16,15 @@ echo ""
 echo "📥 Installing Phase 1 dependencies..."
 echo "   - PyMuPDF (PDF extraction - primary)"
 echo "   - pdfplumber (PDF extraction - fallback)"
+echo "   - pyahocorasick (metadata keyword matching)"
+echo "   - orjson (logging and chunk output)"
 echo "   - pydantic (settings validation)"
 echo "   - pydantic-settings (environment config)"
 echo "   - python-dotenv (.env support)"
 echo ""
 
 # Install dependencies
-pip install PyMuPDF==1.23.26 pdfplumber==0.10.4 python-dotenv==1.0.1 pydantic==2.6.1 pydantic-settings==2.1.0
+pip install PyMuPDF==1.23.26 pdfplumber==0.10.4 pyahocorasick==2.1.0 orjson==3.10.15 python-dotenv==1.0.1 pydantic==2.6.1 pydantic-settings==2.1.0
 
 echo ""
 echo "======================================================"
@@ -34,6 +36,8 @@ echo "🧪 Verifying installation..."
 # Verify installations
 python3 -c "import fitz; print('  ✓ PyMuPDF version:', fitz.__version__)" 2>/dev/null || echo "  ✗ PyMuPDF not found"
 python3 -c "import pdfplumber; print('  ✓ pdfplumber installed')" 2>/dev/null || echo "  ✗ pdfplumber not found"
+python3 -c "import ahocorasick; print('  ✓ pyahocorasick installed')" 2>/dev/null || echo "  ✗ pyahocorasick not found"
+python3 -c "import orjson; print('  ✓ orjson installed')" 2>/dev/null || echo "  ✗ orjson not found"
 python3 -c "from pydantic_settings import BaseSettings; print('  ✓ pydantic-settings installed')" 2>/dev/null || echo "  ✗ pydantic-settings not found"
 python3 -c "from dotenv import load_dotenv; print('  ✓ python-dotenv installed')" 2>/dev/null || echo "  ✗ python-dotenv not found"
 
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Export the local embedding model to ONNX and quantize it to int8
+Output is loaded by LocalEmbeddingGenerator when EMBEDDING_BACKEND=onnx
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+from optimum.onnxruntime.configuration import AutoQuantizationConfig
+from transformers import AutoTokenizer
+
+from app.core.config import settings
+
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+def export_onnx_int8(output_dir: Path = settings.EMBEDDING_ONNX_DIR, avx512: bool = False):
+    """
+    Export to ONNX, then apply dynamic int8 quantization
+    
+    Args:
+        output_dir: Where to write model_quantized.onnx and the tokenizer
+        avx512: Target AVX512-VNNI instead of AVX2 (check the deploy CPU)
+    """
+    print(f"📦 Exporting {MODEL_NAME} to ONNX...")
+    model = ORTModelForFeatureExtraction.from_pretrained(MODEL_NAME, export=True)
+    model.save_pretrained(output_dir)
+    AutoTokenizer.from_pretrained(MODEL_NAME).save_pretrained(output_dir)
+    
+    print("🔢 Quantizing to int8...")
+    if avx512:
+        qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+    else:
+        qconfig = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+    
+    quantizer = ORTQuantizer.from_pretrained(output_dir)
+    quantizer.quantize(save_dir=output_dir, quantization_config=qconfig)
+    
+    print(f"✓ Saved to {output_dir}")
+    print("Set EMBEDDING_BACKEND=onnx to use it")
+
+
+if __name__ == "__main__":
+    export_onnx_int8(avx512="--avx512" in sys.argv)
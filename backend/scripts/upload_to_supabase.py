@@ -4,13 +4,14 @@ Upload processed chunks to Supabase with embeddings
 Phase 3: Complete pipeline
 """
 import sys
-import json
+import time
 from pathlib import Path
-from datetime import datetime
+import orjson
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from app.rag.embeddings import EmbeddingGenerator
+from app.rag.embedded_chunks import save_embedded_chunks
 from app.rag.vector_store import SupabaseVectorStore
 from app.core.config import settings
 from app.core.logger import setup_logger
@@ -18,12 +19,16 @@ from app.core.logger import setup_logger
 logger = setup_logger(__name__)
 
 
-def upload_to_supabase():
+def upload_to_supabase(use_batch_api: bool = False):
     """
     Complete Phase 3 pipeline:
     1. Load processed chunks
     2. Generate embeddings
     3. Upload to Supabase
+    
+    Args:
+        use_batch_api: Embed through the OpenAI Batch API (--batch-api):
+                       half the cost, but may take up to 24 hours
     """
     print("=" * 70)
     print("🚀 Phase 3: Upload to Supabase with Embeddings")
@@ -52,8 +57,7 @@ def upload_to_supabase():
         return False
     
     print(f"📁 Loading chunks from: {chunks_file}")
-    with open(chunks_file, 'r') as f:
-        data = json.load(f)
+    data = orjson.loads(chunks_file.read_bytes())
     
     chunks = data['chunks']
     print(f"✓ Loaded {len(chunks)} chunks")
@@ -62,15 +66,17 @@ def upload_to_supabase():
     # Step 1: Generate embeddings
     print("🔮 Step 1/3: Generating embeddings...")
     print(f"   Model: text-embedding-3-small (1536 dimensions)")
-    print(f"   Cost estimate: ~${len(chunks) * 200 / 1_000_000 * 0.02:.4f}")
+    print(f"   Cost estimate: ~${len(chunks) * 200 / 1_000_000 * 0.02 / (2 if use_batch_api else 1):.4f}")
+    if use_batch_api:
+        print("   Mode: Batch API (results may take up to 24h)")
     print()
     
     generator = EmbeddingGenerator()
-    start_time = datetime.now()
+    start_time = time.perf_counter()
     
-    embedded_chunks = generator.embed_chunks(chunks, batch_size=100)
+    embedded_chunks = generator.embed_chunks(chunks, batch_size=100, use_batch_api=use_batch_api)
     
-    embedding_time = (datetime.now() - start_time).total_seconds()
+    embedding_time = time.perf_counter() - start_time
     print(f"✓ Generated embeddings in {embedding_time:.1f}s")
     print()
     
@@ -78,11 +84,12 @@ def upload_to_supabase():
     embedded_file = settings.OUTPUT_DIR / "processed_chunks" / "budget_chunks_embedded.json"
     print(f"💾 Saving embedded chunks to: {embedded_file}")
     
-    with open(embedded_file, 'w') as f:
-        json.dump({
-            'metadata': data.get('metadata', {}),
-            'chunks': embedded_chunks
-        }, f)
+    # Vectors go to a binary .emb.npy sidecar next to the JSON
+    save_embedded_chunks(
+        embedded_file,
+        embedded_chunks,
+        metadata=data.get('metadata', {})
+    )
     
     print(f"✓ Saved {len(embedded_chunks)} embedded chunks")
     print()
@@ -117,14 +124,17 @@ def upload_to_supabase():
     
     print()
     
-    # Step 3: Upload chunks
+    # Step 3: Upload chunks (with SUPABASE_DB_URL set, batches are COPYed
+    # over the Postgres protocol - larger batches mean fewer transactions)
+    batch_size = 500 if settings.SUPABASE_DB_URL else 100
     print("📤 Step 3/3: Uploading chunks to Supabase...")
-    print(f"   Batch size: 100 chunks")
+    print(f"   Mode: {'COPY' if settings.SUPABASE_DB_URL else 'PostgREST'}")
+    print(f"   Batch size: {batch_size} chunks")
     print()
     
-    upload_start = datetime.now()
-    stats = store.upload_chunks_batch(embedded_chunks, batch_size=100)
-    upload_time = (datetime.now() - upload_start).total_seconds()
+    upload_start = time.perf_counter()
+    stats = store.upload_chunks_batch(embedded_chunks, batch_size=batch_size)
+    upload_time = time.perf_counter() - upload_start
     
     print()
     print("=" * 70)
@@ -152,5 +162,5 @@ def upload_to_supabase():
 
 
 if __name__ == "__main__":
-    success = upload_to_supabase()
+    success = upload_to_supabase(use_batch_api="--batch-api" in sys.argv[1:])
     sys.exit(0 if success else 1)
@@ -2,27 +2,54 @@
 """
 Upload processed chunks to Supabase with LOCAL embeddings (100% free)
 """
+import os
 import sys
-import json
+import time
 from pathlib import Path
-from datetime import datetime
+import orjson
+
+# Size the OpenMP/MKL pools before torch is imported - they are fixed at
+# load time. EMBED_THREADS (see settings) overrides the core count.
+_cpus = os.cpu_count() or 1
+_threads_pinned = bool(os.environ.get("EMBED_THREADS") or os.environ.get("OMP_NUM_THREADS"))
+_threads = str(int(os.environ.get("EMBED_THREADS") or 0) or _cpus)
+os.environ.setdefault("OMP_NUM_THREADS", _threads)
+os.environ.setdefault("MKL_NUM_THREADS", _threads)
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from app.rag.embeddings_local import LocalEmbeddingGenerator
-from app.rag.vector_store import SupabaseVectorStore
+from app.rag.embeddings_local import MULTI_PROCESS_WORKERS, get_embedding_generator
+from app.rag.embedded_chunks import load_embedded_chunks, save_embedded_chunks
+from app.rag.vector_store import SupabaseVectorStore, content_hash
 from app.core.config import settings
 from app.core.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Chunks per embed/upload step (a multiple of the encode batch size)
+UPLOAD_BATCH_SIZE = 128
+
+# Auto-tune the encode batch size from this many chunks up (tuning encodes
+# a 256-text sample once per candidate size)
+TUNE_MIN_CHUNKS = 2000
+
+# Many-core (typically multi-socket) machines encode in several torch
+# processes rather than one (ONNX Runtime has no process pool)
+MULTI_PROCESS_MIN_CPUS = 16
 
-def upload_to_supabase():
+
+def upload_to_supabase(from_saved: bool = False):
     """
     Complete Phase 3 pipeline with LOCAL embeddings:
     1. Load processed chunks
-    2. Generate embeddings locally (FREE)
-    3. Upload to Supabase
+    2. Generate embeddings locally (FREE) and upload to Supabase,
+       overlapping the two batch by batch
+    3. Save embedded chunks
+    
+    Args:
+        from_saved: Upload the chunks saved by a previous run (--from-saved)
+                    instead of embedding again; vectors are memory-mapped
+                    from the .emb.npy sidecar, not parsed
     """
     print("=" * 70)
     print("🚀 Phase 3: Upload to Supabase with Local Embeddings")
@@ -37,56 +64,38 @@ def upload_to_supabase():
     
     # Load chunks
     chunks_file = settings.OUTPUT_DIR / "processed_chunks" / "budget_chunks.json"
-    
-    if not chunks_file.exists():
-        print(f"❌ Chunks file not found: {chunks_file}")
-        print("Run: python test_phase2_pipeline.py first")
-        return False
-    
-    print(f"📁 Loading chunks from: {chunks_file}")
-    with open(chunks_file, 'r') as f:
-        data = json.load(f)
-    
-    chunks = data['chunks']
-    print(f"✓ Loaded {len(chunks)} chunks")
-    print()
-    
-    # Step 1: Generate embeddings locally
-    print("🔮 Step 1/3: Generating embeddings locally...")
-    print(f"   Model: sentence-transformers/all-MiniLM-L6-v2")
-    print(f"   Dimensions: 384")
-    print(f"   Cost: FREE (runs on your CPU)")
-    print()
-    
-    generator = LocalEmbeddingGenerator()
-    start_time = datetime.now()
-    
-    embedded_chunks = generator.embed_chunks(chunks, batch_size=32)
-    
-    embedding_time = (datetime.now() - start_time).total_seconds()
-    print(f"✓ Generated embeddings in {embedding_time:.1f}s")
-    print()
-    
-    # Save embedded chunks locally
     embedded_file = settings.OUTPUT_DIR / "processed_chunks" / "budget_chunks_embedded.json"
-    print(f"💾 Saving embedded chunks to: {embedded_file}")
     
-    with open(embedded_file, 'w') as f:
-        json.dump({
-            'metadata': data.get('metadata', {}),
-            'chunks': embedded_chunks
-        }, f)
+    if from_saved:
+        if not embedded_file.exists():
+            print(f"❌ Embedded chunks file not found: {embedded_file}")
+            print("Run without --from-saved first")
+            return False
+        
+        print(f"📁 Loading embedded chunks from: {embedded_file}")
+        chunks = load_embedded_chunks(embedded_file)
+    else:
+        if not chunks_file.exists():
+            print(f"❌ Chunks file not found: {chunks_file}")
+            print("Run: python test_phase2_pipeline.py first")
+            return False
+        
+        print(f"📁 Loading chunks from: {chunks_file}")
+        data = orjson.loads(chunks_file.read_bytes())
+        chunks = data['chunks']
     
-    print(f"✓ Saved {len(embedded_chunks)} embedded chunks")
+    print(f"✓ Loaded {len(chunks)} chunks")
     print()
     
-    # Step 2: Initialize Supabase
-    print("🗄️  Step 2/3: Connecting to Supabase...")
+    # Step 1: Initialize Supabase
+    print("🗄️  Step 1/3: Connecting to Supabase...")
     print(f"   URL: {settings.SUPABASE_URL}")
     print(f"   Table: {settings.SUPABASE_TABLE}")
     print()
     
     store = SupabaseVectorStore()
+    upload = True
+    only_new = False
     
     # Check if table exists
     try:
@@ -95,27 +104,121 @@ def upload_to_supabase():
         
         if count > 0:
             print(f"\n⚠️  WARNING: Database already has {count} chunks")
-            response = input("Delete existing chunks and re-upload? (yes/no): ")
+            response = input("Delete existing chunks and re-upload (yes), upload only new/changed chunks (new), or skip (no)? ")
             if response.lower() == 'yes':
                 store.delete_all_chunks()
                 print("✓ Existing chunks deleted")
+            elif response.lower() == 'new':
+                only_new = True
             else:
                 print("Skipping upload. Existing chunks will remain.")
-                return True
+                upload = False
     except Exception as e:
         print(f"✓ Table is ready (empty)")
     
+    if only_new:
+        # Unchanged text means an unchanged embedding - skip those chunks
+        hashes = [content_hash(chunk['text']) for chunk in chunks]
+        existing = store.get_existing_hashes(hashes)
+        for chunk, chunk_hash in zip(chunks, hashes):
+            chunk['content_hash'] = chunk_hash
+        chunks = [chunk for chunk, chunk_hash in zip(chunks, hashes) if chunk_hash not in existing]
+        print(f"✓ {len(hashes) - len(chunks)} chunks unchanged, {len(chunks)} to embed and upload")
+    
+    print()
+    
+    if from_saved:
+        if not upload:
+            return True
+        
+        print("📤 Step 2/3: Uploading saved embeddings to Supabase...")
+        print(f"   Batch size: {UPLOAD_BATCH_SIZE} chunks")
+        print()
+        
+        start_time = time.perf_counter()
+        stats = store.upload_chunks_batch(chunks, batch_size=UPLOAD_BATCH_SIZE)
+        pipeline_time = time.perf_counter() - start_time
+        return _print_summary(stats, pipeline_time)
+    
+    # Step 2: Generate embeddings locally, uploading each batch while the
+    # next one is embedded (CPU-bound encode overlaps network-bound upload)
+    print("🔮 Step 2/3: Generating embeddings locally" + (" and uploading..." if upload else "..."))
+    print(f"   Model: sentence-transformers/all-MiniLM-L6-v2")
+    print(f"   Dimensions: 384")
+    print(f"   Cost: FREE (runs on your CPU)")
+    if upload:
+        print(f"   Batch size: {UPLOAD_BATCH_SIZE} chunks")
+    
+    generator = get_embedding_generator()
+    
+    multi_process = generator.backend == "torch" and _cpus >= MULTI_PROCESS_MIN_CPUS
+    if multi_process:
+        if not _threads_pinned:
+            # Read by the encoder processes as they start (this process's
+            # pools are already sized): each gets its share of the cores
+            per_worker = str(max(1, _cpus // MULTI_PROCESS_WORKERS))
+            os.environ["OMP_NUM_THREADS"] = per_worker
+            os.environ["MKL_NUM_THREADS"] = per_worker
+        print(f"   Encoder processes: {MULTI_PROCESS_WORKERS} ({_cpus} CPUs)")
     print()
     
-    # Step 3: Upload chunks
-    print("📤 Step 3/3: Uploading chunks to Supabase...")
-    print(f"   Batch size: 100 chunks")
+    encode_batch_size = 32
+    if multi_process:
+        # The tuner times a single process - not what runs here
+        encode_batch_size = 64
+    elif len(chunks) >= TUNE_MIN_CHUNKS:
+        encode_batch_size = generator.tune_batch_size([chunk['text'] for chunk in chunks])
+        print(f"   Tuned encode batch size: {encode_batch_size}")
+        print()
+    
+    start_time = time.perf_counter()
+    
+    if multi_process:
+        # The process pool starts once for the whole set, so embed it all
+        # up front and upload afterwards instead of batch by batch
+        generator.embed_chunks(chunks, batch_size=encode_batch_size, multi_process=True)
+        if upload:
+            stats = store.upload_chunks_batch(chunks, batch_size=UPLOAD_BATCH_SIZE)
+    elif upload:
+        stats = store.embed_and_upload(
+            chunks,
+            generator,
+            batch_size=UPLOAD_BATCH_SIZE,
+            embed_batch_size=encode_batch_size
+        )
+    else:
+        generator.embed_chunks(chunks, batch_size=encode_batch_size)
+    
+    # embed_chunks fills in the chunk dicts in place
+    embedded_chunks = chunks
+    pipeline_time = time.perf_counter() - start_time
+    print(f"✓ Done in {pipeline_time:.1f}s")
     print()
     
-    upload_start = datetime.now()
-    stats = store.upload_chunks_batch(embedded_chunks, batch_size=100)
-    upload_time = (datetime.now() - upload_start).total_seconds()
+    # Step 3: Save embedded chunks locally (the full set only - an
+    # incremental run embedded just the changed chunks)
+    if only_new:
+        print("💾 Step 3/3: Skipped (only new/changed chunks were embedded)")
+    else:
+        print(f"💾 Step 3/3: Saving embedded chunks to: {embedded_file}")
+        
+        # Vectors go to a binary .emb.npy sidecar next to the JSON
+        save_embedded_chunks(
+            embedded_file,
+            embedded_chunks,
+            metadata=data.get('metadata', {})
+        )
+        
+        print(f"✓ Saved {len(embedded_chunks)} embedded chunks")
+    
+    if not upload:
+        return True
     
+    return _print_summary(stats, pipeline_time)
+
+
+def _print_summary(stats: dict, pipeline_time: float) -> bool:
+    """Print upload statistics; True if every chunk was uploaded"""
     print()
     print("=" * 70)
     print("📊 UPLOAD SUMMARY")
@@ -123,9 +226,7 @@ def upload_to_supabase():
     print(f"Total chunks: {stats['total']}")
     print(f"Uploaded: {stats['success']}")
     print(f"Failed: {stats['failed']}")
-    print(f"Upload time: {upload_time:.1f}s")
-    print(f"Embedding time: {embedding_time:.1f}s")
-    print(f"Total time: {embedding_time + upload_time:.1f}s")
+    print(f"Elapsed time: {pipeline_time:.1f}s")
     print()
     
     if stats['failed'] == 0:
@@ -142,5 +243,5 @@ def upload_to_supabase():
 
 
 if __name__ == "__main__":
-    success = upload_to_supabase()
+    success = upload_to_supabase(from_saved="--from-saved" in sys.argv[1:])
     sys.exit(0 if success else 1)
@@ -16,9 +16,12 @@ CREATE TABLE IF NOT EXISTS budget_chunks (
   text TEXT NOT NULL,
   word_count INTEGER,
   quality_score FLOAT,
+  content_hash TEXT,  -- blake2b of the text; re-runs skip unchanged chunks
   
   -- Embedding (384 dimensions for sentence-transformers/all-MiniLM-L6-v2)
-  embedding vector(384),
+  -- halfvec (pgvector 0.7+) stores 2 bytes per dimension: half the table
+  -- and index size of vector, with no measurable loss in ranking
+  embedding halfvec(384),
   embedding_model TEXT,
   
   -- Metadata (JSONB for flexible querying)
@@ -33,13 +36,24 @@ CREATE TABLE IF NOT EXISTS budget_chunks (
 -- Step 3: Create indexes for fast queries
 CREATE INDEX IF NOT EXISTS idx_document_name ON budget_chunks(document_name);
 CREATE INDEX IF NOT EXISTS idx_quality_score ON budget_chunks(quality_score);
+CREATE INDEX IF NOT EXISTS idx_content_hash ON budget_chunks(content_hash);
 CREATE INDEX IF NOT EXISTS idx_metadata_gin ON budget_chunks USING GIN(metadata);
 
--- Step 4: Create vector similarity index (IVFFlat for fast approximate search)
--- This significantly speeds up vector similarity searches
-CREATE INDEX IF NOT EXISTS idx_embedding_vector 
-ON budget_chunks USING ivfflat (embedding vector_cosine_ops)
-WITH (lists = 100);
+-- Step 4: Create vector similarity index (HNSW for fast approximate search)
+-- Better recall than IVFFlat at the same latency, and no lists to tune or
+-- re-ANALYZE after loading data
+CREATE INDEX IF NOT EXISTS idx_embedding_hnsw
+ON budget_chunks USING hnsw (embedding halfvec_cosine_ops)
+WITH (m = 16, ef_construction = 64);
+
+-- Upgrading a table created with vector(384) + IVFFlat:
+-- DROP INDEX IF EXISTS idx_embedding_vector;
+-- ALTER TABLE budget_chunks ALTER COLUMN embedding TYPE halfvec(384) USING embedding::halfvec(384);
+-- (then run Step 4 and Step 5 again)
+
+-- Upgrading a table created without content_hash:
+-- ALTER TABLE budget_chunks ADD COLUMN IF NOT EXISTS content_hash TEXT;
+-- (then run Step 3 again; existing rows are re-uploaded once to fill it)
 
 -- Step 5: Create similarity search function
 -- This function performs vector similarity search with optional metadata filtering
@@ -58,7 +72,10 @@ RETURNS TABLE (
   similarity float
 )
 LANGUAGE plpgsql
+SET hnsw.ef_search = 40
 AS $$
+DECLARE
+  query_vec halfvec(384) := query_embedding::halfvec(384);
 BEGIN
   RETURN QUERY
   SELECT
@@ -67,12 +84,12 @@ BEGIN
     budget_chunks.page_number,
     budget_chunks.text,
     budget_chunks.metadata,
-    1 - (budget_chunks.embedding <=> query_embedding) as similarity
+    1 - (budget_chunks.embedding <=> query_vec) as similarity
   FROM budget_chunks
   WHERE 
     (filter_metadata = '{}'::jsonb OR budget_chunks.metadata @> filter_metadata)
-    AND 1 - (budget_chunks.embedding <=> query_embedding) > match_threshold
-  ORDER BY budget_chunks.embedding <=> query_embedding
+    AND 1 - (budget_chunks.embedding <=> query_vec) > match_threshold
+  ORDER BY budget_chunks.embedding <=> query_vec
   LIMIT match_count;
 END;
 $$;
@@ -0,0 +1,47 @@
+"""
+Tests for the /batch endpoint
+"""
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.api.v1.endpoints import batch
+
+app = FastAPI()
+app.include_router(batch.router)
+
+
+def _post(payload) -> httpx.Response:
+    async def post():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/batch", json=payload)
+    
+    return asyncio.run(post())
+
+
+def test_invalid_items_fail_individually():
+    response = _post([
+        {"endpoint": "calculate-tax", "params": {"income": 1_000_000, "regime": "new"}},
+        {"endpoint": "calculate-tax", "params": {"income": -5}},
+        {"endpoint": "compare-regimes", "params": {"income": 800_000, "unknown": 1}},
+        {"endpoint": "tax-slabs", "params": {"regime": "old"}},
+    ])
+    
+    assert response.status_code == 200
+    results = response.json()
+    assert [r["status"] for r in results] == [200, 422, 422, 200]
+    assert [r["endpoint"] for r in results] == [
+        "calculate-tax", "calculate-tax", "compare-regimes", "tax-slabs"
+    ]
+    assert results[0]["body"]["total_tax"] == pytest.approx(60_000)
+    assert "income" in results[1]["body"]["detail"]
+    assert "unknown" in results[2]["body"]["detail"]
+
+
+def test_unknown_endpoint_rejects_whole_batch():
+    response = _post([{"endpoint": "not-an-endpoint", "params": {}}])
+    
+    assert response.status_code == 422
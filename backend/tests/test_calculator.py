@@ -0,0 +1,71 @@
+"""
+Tests for the income tax calculator
+"""
+import numpy as np
+import pytest
+
+from app.api.v1.endpoints.calculator import (
+    TaxCalculationRequest,
+    _calculate_tax,
+    _compute_tax,
+)
+
+# (income, regime, deductions, base tax before cess), worked out by hand
+# from the slab tables
+KNOWN_TAX = [
+    (250_000, "new", 0, 0),
+    (300_000, "new", 0, 0),
+    (450_000, "new", 0, 7_500),
+    (700_000, "new", 0, 25_000),
+    (1_000_000, "new", 0, 60_000),
+    (1_200_000, "new", 0, 90_000),
+    (1_500_000, "new", 0, 150_000),
+    (2_000_000, "new", 0, 300_000),
+    (200_000, "old", 0, 0),
+    (500_000, "old", 0, 12_500),
+    (800_000, "old", 0, 72_500),
+    (1_000_000, "old", 0, 112_500),
+    (1_500_000, "old", 150_000, 217_500),
+    (400_000, "old", 500_000, 0),
+]
+
+
+@pytest.mark.parametrize("income, regime, deductions, tax", KNOWN_TAX)
+def test_calculate_tax_known_slabs(income, regime, deductions, tax):
+    response = _calculate_tax(
+        TaxCalculationRequest(income=income, regime=regime, deductions=deductions)
+    )
+    
+    assert response.total_tax == pytest.approx(tax)
+    assert response.cess == pytest.approx(tax * 0.04)
+    assert response.total_liability == pytest.approx(tax * 1.04)
+    assert sum(slab.tax_amount for slab in response.tax_slabs) == pytest.approx(tax)
+
+
+@pytest.mark.parametrize("regime", ["new", "old"])
+def test_compute_tax_known_slabs(regime):
+    cases = [case for case in KNOWN_TAX if case[1] == regime]
+    incomes = np.array([case[0] for case in cases], dtype=np.float64)
+    deductions = np.array([case[2] for case in cases], dtype=np.float64)
+    
+    taxes = _compute_tax(incomes, deductions, regime)
+    
+    np.testing.assert_allclose(taxes, [case[3] for case in cases])
+
+
+@pytest.mark.parametrize("regime", ["new", "old"])
+def test_compute_tax_matches_calculate_tax(regime):
+    rng = np.random.default_rng(0)
+    incomes = rng.uniform(1, 5_000_000, size=500).round(2)
+    deductions = 150_000
+    
+    batched = _compute_tax(incomes, deductions, regime)
+    single = [
+        _calculate_tax(
+            TaxCalculationRequest(income=income, regime=regime, deductions=deductions),
+            detail=False
+        ).total_tax
+        for income in incomes
+    ]
+    
+    np.testing.assert_allclose(batched, single)
@@ -0,0 +1,68 @@
+"""
+Tests for the OpenAI embedding generator
+"""
+import base64
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.rag.embeddings import EmbeddingGenerator
+
+
+class _EmbeddingsHandler(BaseHTTPRequestHandler):
+    """Answers POST /embeddings with vectors [i, i, i, i] as base64"""
+    
+    protocol_version = "HTTP/1.1"  # keep-alive, so clients pool connections
+    
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        data = [
+            {
+                "object": "embedding",
+                "index": i,
+                "embedding": base64.b64encode(np.full(4, i, dtype=np.float32).tobytes()).decode()
+            }
+            for i in range(len(body["input"]))
+        ]
+        payload = json.dumps({
+            "object": "list",
+            "data": data,
+            "model": body["model"],
+            "usage": {"prompt_tokens": 1, "total_tokens": 1}
+        }).encode()
+        
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def generator(monkeypatch):
+    server = HTTPServer(("127.0.0.1", 0), _EmbeddingsHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    
+    monkeypatch.setenv("OPENAI_BASE_URL", f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "sk-test")
+    yield EmbeddingGenerator()
+    
+    server.shutdown()
+    server.server_close()
+
+
+def test_generate_embeddings_batch_twice(generator):
+    # Each call runs its own event loop; the second must not reuse a
+    # connection pool bound to the first (closed) one
+    for _ in range(2):
+        embeddings = generator.generate_embeddings_batch(["a", "b"])
+        
+        assert [e.tolist() for e in embeddings] == [[0.0] * 4, [1.0] * 4]
@@ -0,0 +1,57 @@
+"""
+Tests for the metadata tagger's keyword matching
+"""
+import pytest
+
+from app.ingestion import metadata_tagger
+from app.ingestion.metadata_tagger import MetadataTagger, _KEYWORD_DICTS, _matcher_state
+
+pytest.importorskip("ahocorasick")
+
+_KEYWORDS = sorted({
+    keyword
+    for keyword_dict in _KEYWORD_DICTS
+    for keywords in keyword_dict.values()
+    for keyword in keywords
+})
+
+TEXTS = [
+    "The Finance Minister announced income tax relief for salaried employees.",
+    "GST rates on agricultural equipment and fertilisers were cut for farmers.",
+    "Capital expenditure on railways, highways and renewable energy rises.",
+    "Senior citizens with income up to 12 lakh pay no tax under the new regime.",
+    "MSME credit guarantees and startup incentives in the digital economy.",
+    "",
+    # Every keyword, alone and inside a longer word (matching is by substring)
+    *(f"Provision for {keyword} this year." for keyword in _KEYWORDS),
+    *(f"pre{keyword}s" for keyword in _KEYWORDS),
+    " ".join(_KEYWORDS),
+]
+
+
+def _tags(tagger: MetadataTagger, text: str) -> dict:
+    metadata = tagger.tag_chunk(text, created_at="t").to_dict()
+    return {key: metadata[key] for key in ("topics", "user_types", "sectors", "income_ranges")}
+
+
+@pytest.fixture
+def taggers(monkeypatch):
+    """(Aho-Corasick tagger, tagger built without pyahocorasick)"""
+    _matcher_state.cache_clear()
+    tagger = MetadataTagger(cache_size=0)
+    
+    monkeypatch.setattr(metadata_tagger, "ahocorasick", None)
+    _matcher_state.cache_clear()
+    fallback_tagger = MetadataTagger(cache_size=0)
+    
+    yield tagger, fallback_tagger
+    _matcher_state.cache_clear()
+
+
+def test_automaton_matches_fallback(taggers):
+    tagger, fallback_tagger = taggers
+    assert tagger._automaton is not None
+    assert fallback_tagger._automaton is None
+    
+    for text in TEXTS:
+        assert _tags(tagger, text) == _tags(fallback_tagger, text), text
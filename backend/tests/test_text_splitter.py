@@ -0,0 +1,37 @@
+"""
+Tests for the semantic text splitter
+"""
+import pytest
+
+from app.ingestion.text_splitter import SemanticTextSplitter
+
+TEXT = (
+    "No surcharge applies to CD-ROMs. "
+    "Dr. Rao, i.e. the minister, spoke vs. critics. "
+    "See No. 5 of the Finance Bill, e.g. Mr. Shah's note."
+)
+
+
+@pytest.fixture
+def splitter():
+    return SemanticTextSplitter()
+
+
+def test_abbreviations_do_not_end_sentences(splitter):
+    assert splitter._split_into_sentences(TEXT) == [
+        "No surcharge applies to CD-ROMs.",
+        "Dr. Rao, i.e. the minister, spoke vs. critics.",
+        "See No. 5 of the Finance Bill, e.g. Mr. Shah's note.",
+    ]
+
+
+def test_split_text_keeps_original_text(splitter):
+    # Restoring abbreviations must not add periods that were never there
+    # ('No surcharge' -> 'No. surcharge', 'CD-ROMs ' -> 'CD-ROMs. ')
+    assert splitter.split_text(TEXT) == [TEXT]
+
+
+def test_split_text_sentence_per_chunk():
+    splitter = SemanticTextSplitter(chunk_size=10, chunk_overlap=1, min_chunk_size=1)
+    
+    assert splitter.split_text(TEXT) == splitter._split_into_sentences(TEXT)